@@ -1,6 +1,5 @@
 import os
 
-os.environ["DISPLAY"] = ":0"
 os.environ['SDL_VIDEO_WINDOW_POS'] = "0,0"
 os.environ['PYGAME_BLEND_ALPHA_SDL2'] = "1"
 
@@ -12,6 +11,12 @@ class DisplayConfig:
     BACKGROUND_COLOR = (0, 0, 0)
     FULLSCREEN = True
     
+    # "sdl" shows a window through X; "framebuffer" renders off-screen and
+    # writes dirty regions straight to FRAMEBUFFER_DEVICE, no X server needed
+    OUTPUT_BACKEND = "sdl"
+    FRAMEBUFFER_DEVICE = "/dev/fb1"  # SPI panels usually come after HDMI's fb0; a regular file works for testing
+    FRAMEBUFFER_FORMAT = None  # RGB565 or XRGB8888 for files, devices report their own
+    
     EYE_WIDTH = 100
     EYE_HEIGHT = 100
     EYE_GAP = 30
@@ -21,12 +26,26 @@ class DisplayConfig:
     MAX_OFFSET_Y = 15
     EYE_MOVE_SPEED = 0.2
     
-    SHADOW_LAYERS = 0
+    SPRITE_CACHE_BYTES = 8 * 1024 * 1024
+    SPRITE_QUANTUM = 2  # px, eye sprites are cached per quantized size
+    
+    ATLAS_PATH = "assets/atlas/eyes.atlas"  # baked by tools/bake_atlas.py, optional
+    
+    SHADOW_LAYERS = 3  # glow is cached per eye shape, see SpriteCache.glow_sprite
     SHADOW_SPREAD = 8
+    DEGRADED_FPS = 20
+    IDLE_FPS = 5  # tick rate while nothing on screen moves, 0 keeps the full rate
     PERSPECTIVE_SHIFT = 15
     
+    # Dirty-region updates, see DirtyRegionManager
+    DIRTY_RECT_COST = 1024  # px charged per extra update region
+    DIRTY_MAX_RECTS = 4
+    DIRTY_FULL_FLIP_RATIO = 0.6  # push the whole screen once the regions cover this share
+    
     HEART_COLOR = (255, 105, 180)
     
+    IMAGE_PREFETCH = 8  # decoded frames buffered ahead of GIF/sequence playback
+    
     BLINK_DURATION = 0.15
     SMILE_DURATION = 0.7
     HEART_DURATION = 1.0
@@ -38,6 +57,19 @@ class DisplayConfig:
         "blink", "look", "nod", "shake", "smile"
     ]
     ANIMATION_INTERVAL = (2, 4)
+    
+    # Extra expressions played by name through DISPLAY_ANIMATION, declared as
+    # keyframe tracks like the built-ins in animations.TIMELINE_SPECS, e.g.
+    # "squint": {"duration": 1.2, "tracks": {
+    #     "height": [[0, "height"], [0.2, "height * 0.35", "ease_in_out"],
+    #                [0.8, "height * 0.35"], [1, "height", "ease_in_out"]]}}
+    EXPRESSIONS = {}
+
+
+if DisplayConfig.OUTPUT_BACKEND == "framebuffer":
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+else:
+    os.environ["DISPLAY"] = ":0"
 
 
 class CameraConfig:
@@ -45,21 +77,28 @@ class CameraConfig:
     DEVICE_INDEX = 0
     RESOLUTION = (640, 480)
     FPS = 30
+    EXECUTION_MODE = "process"
 
 
 class AudioConfig:
     ENABLED = False
     SAMPLE_RATE = 16000
     CHANNELS = 1
+    EXECUTION_MODE = "process"
 
 
 class SensorConfig:
     ENABLED = False
     UPDATE_RATE = 10  # Hz
+    EXECUTION_MODE = "thread"
 
 
 class NetworkConfig:
     ENABLED = True
+    EXECUTION_MODE = "thread"
+    LAZY_INIT = True
+    MAX_RESTARTS = 3
+    RESTART_BACKOFF = 2
     
     TIMEOUT = 10
     MAX_RETRIES = 3
@@ -78,7 +117,54 @@ class NetworkConfig:
 
 
 
+class EventConfig:
+    MAX_EVENTS_PER_TICK = 64
+    DISPATCH_BUDGET = 0.005  # seconds
+    INSTRUMENTATION = True
+    STATS_LOG_INTERVAL = 300  # seconds, 0 disables the periodic summary
+
+
+class StartupConfig:
+    PARALLEL_INIT = True
+    INIT_WORKERS = 4
+    INIT_TIMEOUT = 10  # seconds to wait for background init on shutdown
+    REPORT = True
+    IMPORT_REPORT = False
+    IMPORT_REPORT_THRESHOLD = 0.001  # seconds, hide cheaper imports
+
+
+class WatchdogConfig:
+    ENABLED = True
+    FRAME_BUDGET = None  # seconds, defaults to 1 / DisplayConfig.FPS
+    MODULE_BUDGETS = {}  # per-module overrides, e.g. {'display': 0.02}
+    WINDOW = 30  # ticks
+    OVERRUN_THRESHOLD = 10  # overruns within WINDOW before degrading further
+    RECOVERY_TICKS = 300  # consecutive good ticks before restoring a level
+    DEGRADATION_POLICIES = ["skip_non_critical", "reduce_effects", "reduce_fps"]
+    NON_CRITICAL_INTERVAL_SCALE = 4
+
+
+class ProfilerConfig:
+    INTERVAL = 0.005  # seconds between stack samples
+    OUTPUT_DIR = "profiles"
+    MAX_DURATION = 60  # seconds, stops a forgotten profile on its own
+    SIGNAL = "SIGUSR1"  # toggles the profiler, None disables the handler
+    INCLUDE_IDLE = False
+
+
+class MetricsConfig:
+    ENABLED = True
+    HOST = "127.0.0.1"  # local only; "0.0.0.0" lets other machines on the LAN scrape it
+    PORT = 9464
+    SOCKET_PATH = None  # serve on this UNIX socket instead of TCP
+
+
 class RobotConfig:
+    STARTUP = StartupConfig
+    WATCHDOG = WatchdogConfig
+    EVENTS = EventConfig
+    PROFILER = ProfilerConfig
+    METRICS = MetricsConfig
     DISPLAY = DisplayConfig
     CAMERA = CameraConfig
     AUDIO = AudioConfig
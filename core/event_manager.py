@@ -1,7 +1,11 @@
-from typing import Callable, Dict, List, Any
-from enum import Enum, auto
+from typing import Callable, Dict, List, Any, Optional
+from enum import Enum, IntEnum, auto
 from dataclasses import dataclass
+from collections import deque
+from threading import Event as ThreadEvent, Lock
 import logging
+import time
+from core.event_stats import EventBusStats
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +15,7 @@ class EventType(Enum):
     DISPLAY_LOOK = auto()
     DISPLAY_ANIMATION = auto()
     DISPLAY_IMAGE = auto()
+    DISPLAY_OVERLAY = auto()
 
     DISPLAY_VALORANT_INFO = auto()
     
@@ -26,53 +31,290 @@ class EventType(Enum):
     PROXIMITY_ALERT = auto()
 
     NETWORK_REQUEST = auto()
+    NETWORK_RESPONSE = auto()
     
     SYSTEM_SHUTDOWN = auto()
+    SYSTEM_PROFILE = auto()
     MODULE_READY = auto()
     MODULE_ERROR = auto()
 
 
+class EventPriority(IntEnum):
+    CRITICAL = 0
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3
+
+
+EVENT_PRIORITIES: Dict[EventType, EventPriority] = {
+    EventType.SYSTEM_SHUTDOWN: EventPriority.CRITICAL,
+    EventType.MODULE_ERROR: EventPriority.CRITICAL,
+
+    EventType.DISPLAY_EMOTION: EventPriority.HIGH,
+    EventType.DISPLAY_LOOK: EventPriority.HIGH,
+    EventType.DISPLAY_ANIMATION: EventPriority.HIGH,
+    EventType.DISPLAY_IMAGE: EventPriority.HIGH,
+    EventType.DISPLAY_OVERLAY: EventPriority.HIGH,
+    EventType.DISPLAY_VALORANT_INFO: EventPriority.HIGH,
+
+    EventType.CAMERA_FRAME: EventPriority.LOW,
+    EventType.AUDIO_LEVEL: EventPriority.LOW,
+    EventType.SENSOR_DATA: EventPriority.LOW,
+}
+
+
+class CoalescePolicy(Enum):
+    NONE = "none"
+    LATEST = "latest"
+    LATEST_PER_SOURCE = "latest_per_source"
+    MERGE = "merge"
+
+
+DEFAULT_COALESCING: Dict[EventType, CoalescePolicy] = {
+    EventType.DISPLAY_LOOK: CoalescePolicy.LATEST,
+    EventType.FACE_DETECTED: CoalescePolicy.LATEST,
+    EventType.AUDIO_LEVEL: CoalescePolicy.LATEST_PER_SOURCE,
+    EventType.SENSOR_DATA: CoalescePolicy.LATEST_PER_SOURCE,
+}
+
+
 @dataclass
 class Event:
     event_type: EventType
     data: Any = None
     source_module: str = None
+    timestamp: float = 0.0
+
+
+class _CoalescedSlot:
+    __slots__ = ('key', 'event')
+    
+    def __init__(self, key, event: Event):
+        self.key = key
+        self.event = event
 
 
 class EventManager:
     
-    def __init__(self):
+    def __init__(self, max_events_per_tick: Optional[int] = None,
+                 dispatch_budget: Optional[float] = None,
+                 instrument: bool = False, stats_log_interval: float = 0):
         self._subscribers: Dict[EventType, List[Callable]] = {}
-        self._event_queue: List[Event] = []
+        self._subscribe_lock = Lock()
+        self._lanes = tuple(deque() for _ in EventPriority)
+        self._priorities: Dict[EventType, EventPriority] = dict(EVENT_PRIORITIES)
+        self._coalescing: Dict[EventType, CoalescePolicy] = dict(DEFAULT_COALESCING)
+        self._merge_functions: Dict[EventType, Callable[[Event, Event], Event]] = {}
+        self._coalesce_slots: Dict[Any, _CoalescedSlot] = {}
+        self._folded_counts: Dict[EventType, int] = {}
+        self._listeners: List[Callable[[Event], None]] = []
+        self._ingress = deque()
+        self._wakeup = ThreadEvent()
+        self.max_events_per_tick = max_events_per_tick
+        self.dispatch_budget = dispatch_budget
+        self.stats: Optional[EventBusStats] = (
+            EventBusStats(log_interval=stats_log_interval) if instrument else None
+        )
     
-    def subscribe(self, event_type: EventType, callback: Callable[[Event], None]):
-        if event_type not in self._subscribers:
-            self._subscribers[event_type] = []
+    def subscribe(self, event_type: EventType, callback: Callable[[Event], None],
+                  coalesce: Optional[CoalescePolicy] = None,
+                  merge: Optional[Callable[[Event, Event], Event]] = None):
+        if coalesce is not None:
+            current = self._coalescing.get(event_type, CoalescePolicy.NONE)
+            if current not in (CoalescePolicy.NONE, coalesce):
+                logger.warning(
+                    f"Overriding {current.value} coalescing of {event_type.name} with {coalesce.value}"
+                )
+            self.set_coalescing(event_type, coalesce, merge)
         
-        self._subscribers[event_type].append(callback)
+        # Copy-on-write so a dispatch in progress keeps iterating its own snapshot
+        # and modules may subscribe from worker threads
+        with self._subscribe_lock:
+            self._subscribers[event_type] = self._subscribers.get(event_type, []) + [callback]
         logger.debug(f"Subscribed callback to {event_type.name}")
     
     def unsubscribe(self, event_type: EventType, callback: Callable):
-        if event_type in self._subscribers:
-            self._subscribers[event_type].remove(callback)
+        with self._subscribe_lock:
+            if event_type in self._subscribers:
+                callbacks = list(self._subscribers[event_type])
+                callbacks.remove(callback)
+                self._subscribers[event_type] = callbacks
+    
+    def subscribed_types(self) -> List[EventType]:
+        return [event_type for event_type, callbacks in list(self._subscribers.items()) if callbacks]
+    
+    def add_listener(self, listener: Callable[[Event], None]):
+        # Listeners see every published event before coalescing, on the main thread
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable[[Event], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def set_priority(self, event_type: EventType, priority: EventPriority):
+        self._priorities[event_type] = priority
+    
+    def get_priority(self, event_type: EventType) -> EventPriority:
+        return self._priorities.get(event_type, EventPriority.NORMAL)
+    
+    def set_coalescing(self, event_type: EventType, policy: CoalescePolicy,
+                       merge: Optional[Callable[[Event, Event], Event]] = None):
+        if policy == CoalescePolicy.MERGE and merge is None:
+            raise ValueError(f"Merge coalescing for {event_type.name} requires a merge function")
+        self._coalescing[event_type] = policy
+        if merge is not None:
+            self._merge_functions[event_type] = merge
+        else:
+            self._merge_functions.pop(event_type, None)
+    
+    def get_coalescing(self, event_type: EventType) -> CoalescePolicy:
+        return self._coalescing.get(event_type, CoalescePolicy.NONE)
+    
+    def get_coalesce_stats(self) -> Dict[str, int]:
+        return {event_type.name: count for event_type, count in self._folded_counts.items()}
     
     def publish(self, event: Event):
-        self._event_queue.append(event)
+        if not event.timestamp:
+            event.timestamp = time.monotonic()
+        
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Error in event listener: {e}", exc_info=True)
+        
+        policy = self._coalescing.get(event.event_type)
+        if policy is None or policy == CoalescePolicy.NONE:
+            self._lanes[self.get_priority(event.event_type)].append(event)
+            return
+        
+        if policy == CoalescePolicy.LATEST_PER_SOURCE:
+            key = (event.event_type, event.source_module)
+        else:
+            key = event.event_type
+        
+        slot = self._coalesce_slots.get(key)
+        if slot is None:
+            slot = _CoalescedSlot(key, event)
+            self._coalesce_slots[key] = slot
+            self._lanes[self.get_priority(event.event_type)].append(slot)
+            return
+        
+        if policy == CoalescePolicy.MERGE:
+            slot.event = self._merge_functions[event.event_type](slot.event, event)
+        else:
+            slot.event = event
+        self._folded_counts[event.event_type] = self._folded_counts.get(event.event_type, 0) + 1
     
     def emit(self, event_type: EventType, data: Any = None, source: str = None):
         event = Event(event_type=event_type, data=data, source_module=source)
         self.publish(event)
     
-    def process_events(self):
-        while self._event_queue:
-            event = self._event_queue.pop(0)
+    def publish_threadsafe(self, event: Event):
+        # deque.append is atomic, so worker threads never touch the lanes directly
+        if not event.timestamp:
+            event.timestamp = time.monotonic()
+        self._ingress.append(event)
+        self._wakeup.set()
+    
+    def emit_threadsafe(self, event_type: EventType, data: Any = None, source: str = None):
+        event = Event(event_type=event_type, data=data, source_module=source)
+        self.publish_threadsafe(event)
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if self.has_pending():
+            return True
+        woken = self._wakeup.wait(timeout)
+        self._wakeup.clear()
+        return woken or self.has_pending()
+    
+    def wakeup(self):
+        self._wakeup.set()
+    
+    def _pull_ingress(self):
+        ingress = self._ingress
+        while ingress:
+            self.publish(ingress.popleft())
+    
+    def pending_count(self) -> int:
+        return sum(len(lane) for lane in self._lanes) + len(self._ingress)
+    
+    def has_pending(self) -> bool:
+        return bool(self._ingress) or any(self._lanes)
+    
+    def _next_event(self) -> Optional[Event]:
+        for lane in self._lanes:
+            if lane:
+                item = lane.popleft()
+                if type(item) is _CoalescedSlot:
+                    del self._coalesce_slots[item.key]
+                    return item.event
+                return item
+        return None
+    
+    def process_events(self, max_events: Optional[int] = None,
+                       time_budget: Optional[float] = None) -> int:
+        if max_events is None:
+            max_events = self.max_events_per_tick
+        if time_budget is None:
+            time_budget = self.dispatch_budget
+        deadline = time.perf_counter() + time_budget if time_budget else None
+        
+        self._pull_ingress()
+        if self.stats:
+            self.stats.record_depth(self.pending_count())
+            self.stats.maybe_log()
+        
+        dispatched = 0
+        while max_events is None or dispatched < max_events:
+            event = self._next_event()
+            if event is None:
+                break
+            
+            self._dispatch(event)
+            dispatched += 1
             
-            if event.event_type in self._subscribers:
-                for callback in self._subscribers[event.event_type]:
-                    try:
-                        callback(event)
-                    except Exception as e:
-                        logger.error(f"Error in event callback: {e}", exc_info=True)
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        
+        return dispatched
+    
+    def drain(self) -> int:
+        self._pull_ingress()
+        dispatched = 0
+        event = self._next_event()
+        while event is not None:
+            self._dispatch(event)
+            dispatched += 1
+            event = self._next_event()
+        return dispatched
+    
+    def _dispatch(self, event: Event):
+        stats = self.stats
+        if stats:
+            stats.record_latency(event.event_type, time.monotonic() - event.timestamp)
+        
+        callbacks = self._subscribers.get(event.event_type)
+        if callbacks:
+            for callback in callbacks:
+                started = time.perf_counter() if stats else 0.0
+                try:
+                    callback(event)
+                except Exception as e:
+                    logger.error(f"Error in event callback: {e}", exc_info=True)
+                if stats:
+                    stats.record_callback(event.event_type, callback, time.perf_counter() - started)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        if not self.stats:
+            return {}
+        snapshot = self.stats.snapshot()
+        snapshot["pending"] = self.pending_count()
+        snapshot["coalesced"] = self.get_coalesce_stats()
+        return snapshot
     
     def clear(self):
-        self._event_queue.clear()
+        self._ingress.clear()
+        self._coalesce_slots.clear()
+        for lane in self._lanes:
+            lane.clear()
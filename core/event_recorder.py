@@ -0,0 +1,200 @@
+import json
+import logging
+import pickle
+import random
+import struct
+import threading
+import time
+from typing import BinaryIO, Iterator, List, Optional, Set, Tuple
+from core.event_manager import EventManager, EventType, Event
+from utils.clock import SimulatedClock, get_clock, set_clock
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ADAEVT\x01\n"
+HEADER_LENGTH = struct.Struct("<I")
+# offset since recording start, event type index, payload codec, source length, payload length
+RECORD = struct.Struct("<dHBHI")
+
+CODEC_NONE = 0
+CODEC_PICKLE = 1
+
+FLUSH_INTERVAL = 1.0
+
+
+class EventRecorder:
+
+    def __init__(self, path: str, seed: Optional[int] = None):
+        self.path = path
+        self.seed = seed
+        self.event_types: List[EventType] = list(EventType)
+        self._type_index = {event_type: index for index, event_type in enumerate(self.event_types)}
+        self._file: Optional[BinaryIO] = None
+        self._event_manager: Optional[EventManager] = None
+        self._start_time = 0.0
+        self._last_flush = 0.0
+        self.recorded = 0
+
+    def attach(self, event_manager: EventManager):
+        self._file = open(self.path, "wb")
+        self._start_time = time.monotonic()
+        self._last_flush = self._start_time
+
+        header = json.dumps({
+            "version": 1,
+            "event_types": [event_type.name for event_type in self.event_types],
+            "seed": self.seed,
+            "created": time.time(),
+        }).encode("utf-8")
+        self._file.write(MAGIC)
+        self._file.write(HEADER_LENGTH.pack(len(header)))
+        self._file.write(header)
+
+        self._event_manager = event_manager
+        event_manager.add_listener(self._on_event)
+        logger.info(f"Recording events to {self.path}")
+
+    def _on_event(self, event: Event):
+        if self._file is None:
+            return
+
+        source = (event.source_module or "").encode("utf-8")
+        if event.data is None:
+            codec, payload = CODEC_NONE, b""
+        else:
+            codec, payload = CODEC_PICKLE, pickle.dumps(event.data, protocol=pickle.HIGHEST_PROTOCOL)
+
+        offset = (event.timestamp or time.monotonic()) - self._start_time
+        self._file.write(RECORD.pack(
+            offset, self._type_index[event.event_type], codec, len(source), len(payload)
+        ))
+        self._file.write(source)
+        self._file.write(payload)
+        self.recorded += 1
+
+        if event.timestamp - self._last_flush >= FLUSH_INTERVAL:
+            self._file.flush()
+            self._last_flush = event.timestamp
+
+    def close(self):
+        if self._event_manager:
+            self._event_manager.remove_listener(self._on_event)
+            self._event_manager = None
+        if self._file:
+            self._file.close()
+            self._file = None
+            logger.info(f"Recorded {self.recorded} events to {self.path}")
+
+
+class EventLogReader:
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.header = self._read_header(f)
+            self._data_start = f.tell()
+        self.seed: Optional[int] = self.header.get("seed")
+        self.event_types = [EventType[name] if name in EventType.__members__ else None
+                            for name in self.header["event_types"]]
+
+    @staticmethod
+    def _read_header(f: BinaryIO) -> dict:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not an event log")
+        (length,) = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+        return json.loads(f.read(length).decode("utf-8"))
+
+    def __iter__(self) -> Iterator[Tuple[float, Event]]:
+        with open(self.path, "rb") as f:
+            f.seek(self._data_start)
+            while True:
+                raw = f.read(RECORD.size)
+                if len(raw) < RECORD.size:
+                    break  # truncated tail from an unclean shutdown
+                offset, type_index, codec, source_length, payload_length = RECORD.unpack(raw)
+                source = f.read(source_length).decode("utf-8") or None
+                payload = f.read(payload_length)
+                if len(payload) < payload_length:
+                    break
+
+                event_type = self.event_types[type_index]
+                if event_type is None:
+                    continue
+                data = pickle.loads(payload) if codec == CODEC_PICKLE else None
+                yield offset, Event(event_type=event_type, data=data, source_module=source)
+
+
+class EventReplayer:
+
+    def __init__(self, path: str, skip_sources: Set[str] = frozenset({"controller"})):
+        self.reader = EventLogReader(path)
+        self.skip_sources = skip_sources
+
+    def events(self) -> Iterator[Tuple[float, Event]]:
+        for offset, event in self.reader:
+            if event.source_module in self.skip_sources:
+                continue
+            yield offset, event
+
+    def replay(self, controller, speed: float = 1.0):
+        if self.reader.seed is not None:
+            random.seed(self.reader.seed)
+
+        if speed and speed > 0:
+            self._replay_realtime(controller, speed)
+        else:
+            self._replay_fast(controller)
+
+    def _replay_realtime(self, controller, speed: float):
+        event_manager = controller.event_manager
+
+        def _feed():
+            start = time.monotonic()
+            for offset, event in self.events():
+                delay = offset / speed - (time.monotonic() - start)
+                if delay > 0:
+                    time.sleep(delay)
+                if not controller.running:
+                    return
+                event_manager.publish_threadsafe(event)
+            event_manager.emit_threadsafe(EventType.SYSTEM_SHUTDOWN, source="replay")
+
+        controller.running = True
+        controller.initialize_modules()
+        feeder = threading.Thread(target=_feed, name="event-replay", daemon=True)
+        feeder.start()
+        try:
+            controller.run()
+        finally:
+            controller.shutdown()
+
+    def _replay_fast(self, controller):
+        # Runs on a simulated clock moved to each recorded offset, ticking at
+        # every scheduled deadline on the way, so animations see the recorded
+        # timing and a replay gives the same frames every run without sleeping
+        event_manager = controller.event_manager
+        previous_clock = get_clock()
+        clock = SimulatedClock()
+        set_clock(clock)
+        for module in controller.modules.values():
+            # Registered against the real clock, start them over on the simulated one
+            controller.scheduler.add(module, clock.monotonic())
+        controller.running = True
+        controller.initialize_modules()
+        try:
+            for offset, event in self.events():
+                self._advance(controller, clock, offset)
+                if not controller.running:
+                    break
+                event_manager.publish(event)
+            controller.tick()
+        finally:
+            controller.shutdown()
+            set_clock(previous_clock)
+
+    @staticmethod
+    def _advance(controller, clock: SimulatedClock, target: float):
+        while controller.running and clock.monotonic() < target:
+            controller.tick()
+            step = controller.scheduler.time_until_next(clock.monotonic())
+            clock.advance(min(step, target - clock.monotonic()) if step > 0 else 1e-6)
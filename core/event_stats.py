@@ -0,0 +1,87 @@
+import logging
+import time
+from typing import Callable, Dict, Tuple, Any
+from utils.metrics import Histogram, COUNT_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+
+def callback_name(callback: Callable) -> str:
+    owner = getattr(callback, '__self__', None)
+    name = getattr(callback, '__name__', None) or repr(callback)
+    if owner is not None:
+        module_name = owner.get_name() if hasattr(owner, 'get_name') else type(owner).__name__
+        return f"{module_name}.{name}"
+    return getattr(callback, '__qualname__', name)
+
+
+class EventBusStats:
+    
+    def __init__(self, log_interval: float = 0):
+        self.log_interval = log_interval
+        self.queue_depth = Histogram(COUNT_BUCKETS)
+        self.max_queue_depth = 0
+        self.latency: Dict[Any, Histogram] = {}
+        self.callbacks: Dict[Tuple[Any, str], Histogram] = {}
+        self._callback_names: Dict[Callable, str] = {}
+        self._last_log_time = time.monotonic()
+    
+    def record_depth(self, depth: int):
+        self.queue_depth.observe(depth)
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+    
+    def record_latency(self, event_type, seconds: float):
+        histogram = self.latency.get(event_type)
+        if histogram is None:
+            histogram = self.latency[event_type] = Histogram()
+        histogram.observe(seconds)
+    
+    def record_callback(self, event_type, callback: Callable, seconds: float):
+        name = self._callback_names.get(callback)
+        if name is None:
+            name = self._callback_names[callback] = callback_name(callback)
+        key = (event_type, name)
+        histogram = self.callbacks.get(key)
+        if histogram is None:
+            histogram = self.callbacks[key] = Histogram()
+        histogram.observe(seconds)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": dict(self.queue_depth.snapshot(), peak=self.max_queue_depth),
+            "latency": {
+                event_type.name: histogram.snapshot()
+                for event_type, histogram in self.latency.items()
+            },
+            "callbacks": {
+                f"{event_type.name}:{name}": histogram.snapshot()
+                for (event_type, name), histogram in self.callbacks.items()
+            },
+        }
+    
+    def format_summary(self, top: int = 5) -> str:
+        slowest = sorted(self.callbacks.items(), key=lambda item: item[1].total, reverse=True)[:top]
+        callbacks = ", ".join(
+            f"{event_type.name}:{name} n={hist.count} p95={hist.percentile(0.95) * 1000:.2f}ms "
+            f"max={hist.max * 1000:.2f}ms"
+            for (event_type, name), hist in slowest
+        )
+        return (
+            f"Event bus: depth p95={self.queue_depth.percentile(0.95):.0f} peak={self.max_queue_depth}; "
+            f"slowest callbacks: {callbacks or 'none'}"
+        )
+    
+    def maybe_log(self):
+        if not self.log_interval:
+            return
+        now = time.monotonic()
+        if now - self._last_log_time >= self.log_interval:
+            self._last_log_time = now
+            logger.info(self.format_summary())
+    
+    def reset(self):
+        self.queue_depth.reset()
+        self.max_queue_depth = 0
+        self.latency.clear()
+        self.callbacks.clear()
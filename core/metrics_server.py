@@ -0,0 +1,134 @@
+import logging
+import os
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler
+from typing import Optional
+from utils.metrics import Histogram, PrometheusExposition, process_rss_bytes
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        try:
+            body = self.server.collect().encode("utf-8")
+        except Exception as e:
+            logger.error(f"Failed to collect metrics: {e}", exc_info=True)
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would drown robot.log; client_address is also empty on UNIX sockets
+        pass
+
+
+class _TCPMetricsServer(socketserver.TCPServer):
+    # Not HTTPServer: its server_bind does a reverse DNS lookup that can stall boot offline
+    allow_reuse_address = True
+
+
+class MetricsServer:
+    # Read-only Prometheus endpoint served from a daemon thread. Collection reads
+    # the main loop's counters without locking, so a scrape may be a tick stale.
+
+    def __init__(self, controller, config):
+        self.controller = controller
+        self.config = config
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        socket_path = getattr(self.config, 'SOCKET_PATH', None)
+        try:
+            if socket_path:
+                if os.path.exists(socket_path):
+                    os.unlink(socket_path)
+                self._server = socketserver.UnixStreamServer(socket_path, _MetricsHandler)
+                address = socket_path
+            else:
+                self._server = _TCPMetricsServer((self.config.HOST, self.config.PORT), _MetricsHandler)
+                address = f"http://{self.config.HOST}:{self._server.server_address[1]}/metrics"
+        except OSError as e:
+            logger.error(f"Metrics endpoint disabled, cannot bind: {e}")
+            self._server = None
+            return
+
+        self._server.collect = self.collect
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+        logger.info(f"Serving metrics on {address}")
+
+    def stop(self):
+        if not self._server:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        socket_path = getattr(self.config, 'SOCKET_PATH', None)
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self._thread.join()
+        self._server = None
+
+    def collect(self) -> str:
+        exposition = PrometheusExposition(prefix="ada_")
+        controller = self.controller
+        event_manager = controller.event_manager
+
+        rss = process_rss_bytes()
+        if rss is not None:
+            exposition.gauge("process_resident_memory_bytes", rss, help_text="Resident set size")
+
+        exposition.gauge("event_queue_depth", event_manager.pending_count(),
+                         help_text="Events waiting to be dispatched")
+        stats = event_manager.stats
+        if stats:
+            exposition.histogram("event_queue_depth_per_tick", stats.queue_depth,
+                                 help_text="Queue depth seen at the start of each dispatch pass")
+            for event_type, histogram in list(stats.latency.items()):
+                exposition.histogram("event_latency_seconds", histogram, {"type": event_type.name},
+                                     help_text="Time from publish to dispatch")
+
+        watchdog = controller.watchdog
+        if watchdog:
+            exposition.gauge("degradation_level", watchdog.level,
+                             help_text="Number of active degradation policies")
+            exposition.histogram("tick_seconds", watchdog.tick_cost,
+                                 help_text="Main loop work per tick")
+            for name, histogram in list(watchdog.module_costs.items()):
+                exposition.histogram("module_update_seconds", histogram, {"module": name},
+                                     help_text="Main-thread update cost per module")
+            for name, count in list(watchdog.overrun_counts.items()):
+                exposition.counter("module_overruns_total", count, {"module": name},
+                                   help_text="Ticks over budget attributed to the module")
+
+        modules = list(controller.modules.items())
+        for name, module in modules:
+            exposition.gauge("module_initialized", int(module.is_initialized()), {"module": name})
+        for name, module in modules:
+            try:
+                metrics = module.get_metrics()
+            except Exception as e:
+                logger.error(f"Error collecting metrics from {name}: {e}")
+                continue
+            for key, value in metrics.items():
+                metric = f"{name}_{key}"
+                if isinstance(value, Histogram):
+                    exposition.histogram(metric, value)
+                elif key.endswith("_total"):
+                    exposition.counter(metric, value)
+                else:
+                    exposition.gauge(metric, value)
+
+        return exposition.render()
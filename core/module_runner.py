@@ -0,0 +1,225 @@
+import logging
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple
+from core.event_manager import EventManager, EventType, Event
+from modules.base_module import BaseModule
+
+logger = logging.getLogger(__name__)
+
+INBOX_SIZE = 256
+BACKPRESSURE_PENDING = 512
+BACKPRESSURE_WAIT = 0.05
+JOIN_TIMEOUT = 5.0
+
+
+class ExecutionMode(Enum):
+    INLINE = "inline"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+class RestartPolicy:
+
+    def __init__(self, max_restarts: int = 3, backoff: float = 1.0, max_backoff: float = 30.0):
+        self.max_restarts = max_restarts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.restarts = 0
+
+    @classmethod
+    def from_config(cls, config) -> "RestartPolicy":
+        return cls(
+            max_restarts=getattr(config, 'MAX_RESTARTS', 3),
+            backoff=getattr(config, 'RESTART_BACKOFF', 1.0),
+        )
+
+    def next_delay(self) -> Optional[float]:
+        if self.restarts >= self.max_restarts:
+            return None
+        return min(self.backoff * 2 ** self.restarts, self.max_backoff)
+
+    def record_restart(self):
+        self.restarts += 1
+
+
+class _ThreadEventBridge:
+    # Stands in for the EventManager inside a threaded module: subscriptions are
+    # delivered on the module's own thread and everything it emits is thread-safe.
+
+    def __init__(self, host: "ThreadedModuleHost", event_manager: EventManager):
+        self._host = host
+        self._event_manager = event_manager
+        self._wrappers: Dict[Tuple[EventType, Callable], Callable] = {}
+
+    def subscribe(self, event_type: EventType, callback: Callable[[Event], None], **kwargs):
+        if (event_type, callback) in self._wrappers:
+            return
+        wrapper = self._wrappers[(event_type, callback)] = (
+            lambda event: self._host.deliver(callback, event)
+        )
+        self._event_manager.subscribe(event_type, wrapper, **kwargs)
+
+    def unsubscribe(self, event_type: EventType, callback: Callable):
+        wrapper = self._wrappers.pop((event_type, callback), None)
+        if wrapper:
+            self._event_manager.unsubscribe(event_type, wrapper)
+
+    def unsubscribe_all(self):
+        for (event_type, _), wrapper in list(self._wrappers.items()):
+            self._event_manager.unsubscribe(event_type, wrapper)
+        self._wrappers.clear()
+
+    def publish(self, event: Event):
+        # Back-pressure: slow the producer down while the main loop is behind
+        deadline = time.monotonic() + BACKPRESSURE_WAIT
+        while (self._event_manager.pending_count() > BACKPRESSURE_PENDING and
+               time.monotonic() < deadline and not self._host.stopping):
+            self._host.wait(0.005)
+        self._event_manager.publish_threadsafe(event)
+
+    def emit(self, event_type: EventType, data: Any = None, source: str = None):
+        self.publish(Event(event_type=event_type, data=data, source_module=source))
+
+    publish_threadsafe = publish
+    emit_threadsafe = emit
+
+    def __getattr__(self, name):
+        return getattr(self._event_manager, name)
+
+
+class ThreadedModuleHost(BaseModule):
+
+    def __init__(self, module: BaseModule):
+        super().__init__(module.config)
+        self.module = module
+        self._name = module.get_name()
+        self._thread: Optional[threading.Thread] = None
+        self._inbox = deque()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._bridge: Optional[_ThreadEventBridge] = None
+        self.restart_policy = RestartPolicy.from_config(module.config)
+        self.dropped_events = 0
+        self.failed = False
+
+    def get_name(self) -> str:
+        return self._name
+
+    def get_update_interval(self) -> float:
+        return 1.0
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def wait(self, timeout: float):
+        self._stop.wait(timeout)
+
+    def set_event_manager(self, event_manager: EventManager):
+        super().set_event_manager(event_manager)
+        self._bridge = _ThreadEventBridge(self, event_manager)
+        self.module.set_event_manager(self._bridge)
+
+    def deliver(self, callback: Callable, event: Event):
+        # Called on the main thread; bounded so a stalled module cannot grow memory
+        if len(self._inbox) >= INBOX_SIZE:
+            self._inbox.popleft()
+            self.dropped_events += 1
+        self._inbox.append((callback, event))
+        self._wakeup.set()
+
+    def initialize(self):
+        logger.info(f"Starting {self._name} on a dedicated thread")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"ada-{self._name}", daemon=True)
+        self._thread.start()
+        self._initialized = True
+
+    def _drain_inbox(self):
+        inbox = self._inbox
+        while inbox:
+            callback, event = inbox.popleft()
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Error in event callback of {self._name}: {e}", exc_info=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.module.initialize()
+                self._run_loop()
+                return
+            except Exception as e:
+                logger.error(f"Module {self._name} crashed: {e}", exc_info=True)
+                self.event_manager.emit_threadsafe(
+                    EventType.MODULE_ERROR,
+                    data={"module": self._name, "error": str(e)},
+                    source=self._name
+                )
+                self._safe_shutdown()
+                self._bridge.unsubscribe_all()
+
+            delay = self.restart_policy.next_delay()
+            if delay is None:
+                logger.error(f"Module {self._name} exceeded {self.restart_policy.max_restarts} restarts, giving up")
+                self.failed = True
+                return
+            self.restart_policy.record_restart()
+            logger.info(f"Restarting {self._name} in {delay:.1f}s")
+            self._stop.wait(delay)
+
+    def _run_loop(self):
+        module = self.module
+        deadline = time.monotonic()
+        while not self._stop.is_set():
+            self._drain_inbox()
+
+            now = time.monotonic()
+            if now >= deadline:
+                if module.is_enabled():
+                    module.update()
+                next_deadline = module.get_next_update_time(now)
+                if next_deadline is None:
+                    next_deadline = max(deadline + module.get_update_interval(), now)
+                deadline = next_deadline
+
+            if not self._inbox:
+                self._wakeup.wait(max(deadline - time.monotonic(), 0.0))
+                self._wakeup.clear()
+
+        self._drain_inbox()
+        self._safe_shutdown()
+
+    def _safe_shutdown(self):
+        try:
+            self.module.shutdown()
+        except Exception as e:
+            logger.error(f"Error shutting down module {self._name}: {e}")
+
+    def update(self):
+        if self.dropped_events:
+            logger.warning(f"{self._name} is falling behind, dropped {self.dropped_events} events")
+            self.dropped_events = 0
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return dict(self.module.get_metrics(), inbox_depth=len(self._inbox),
+                    restarts_total=self.restart_policy.restarts)
+    
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def shutdown(self):
+        logger.info(f"Stopping thread for {self._name}")
+        if self._bridge:
+            self._bridge.unsubscribe_all()
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(JOIN_TIMEOUT)
+            if self._thread.is_alive():
+                logger.warning(f"Thread for {self._name} did not stop within {JOIN_TIMEOUT}s")
+        self._initialized = False
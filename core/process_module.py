@@ -0,0 +1,262 @@
+import logging
+import multiprocessing
+import pickle
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from core.event_manager import EventManager, EventType, Event
+from core.module_runner import RestartPolicy
+from core.shared_memory import SharedRingBuffer, SharedSlotPool, release_attachments
+from modules.base_module import BaseModule
+
+logger = logging.getLogger(__name__)
+
+RING_CAPACITY = 1 << 20
+SHARED_PAYLOAD_THRESHOLD = 64 * 1024
+SHARED_SLOT_SIZE = 2 * 1024 * 1024
+SHARED_SLOT_COUNT = 4
+MONITOR_INTERVAL = 0.1
+JOIN_TIMEOUT = 5.0
+
+MSG_EVENT = 0
+MSG_SUBSCRIBE = 1
+MSG_READY = 2
+MSG_ERROR = 3
+
+
+def _config_snapshot(config) -> Dict[str, Any]:
+    # Config classes are patched at runtime (see load_config_from_env), so ship values, not references
+    return {key: getattr(config, key) for key in dir(config) if key.isupper()}
+
+
+def _is_bulk(value) -> bool:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value) >= SHARED_PAYLOAD_THRESHOLD
+    np = sys.modules.get("numpy")
+    return np is not None and isinstance(value, np.ndarray) and value.nbytes >= SHARED_PAYLOAD_THRESHOLD
+
+
+class _Channel:
+
+    def __init__(self, outbound: SharedRingBuffer, inbound: SharedRingBuffer,
+                 notify_remote, pool: Optional[SharedSlotPool] = None):
+        self.outbound = outbound
+        self.inbound = inbound
+        self.notify_remote = notify_remote
+        self.pool = pool
+
+    def _share(self, data):
+        if self.pool is None:
+            return data
+        if _is_bulk(data):
+            return self.pool.put(data) or data
+        if isinstance(data, dict) and any(_is_bulk(value) for value in data.values()):
+            return {key: (self.pool.put(value) or value) if _is_bulk(value) else value
+                    for key, value in data.items()}
+        return data
+
+    def send(self, message) -> bool:
+        sent = self.outbound.write(pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL))
+        self.notify_remote.set()
+        return sent
+
+    def send_event(self, event: Event) -> bool:
+        return self.send((MSG_EVENT, event.event_type.value, event.source_module,
+                          self._share(event.data)))
+
+    def receive(self) -> List[tuple]:
+        return [pickle.loads(record) for record in self.inbound.read_all()]
+
+
+def _child_main(module_class, config_values, name, to_parent, to_child,
+                parent_notify, child_notify, stop_flag):
+    config = type(f"{module_class.__name__}Config", (), config_values)
+    channel = _Channel(
+        SharedRingBuffer(to_parent), SharedRingBuffer(to_child), parent_notify,
+        SharedSlotPool(SHARED_SLOT_SIZE, SHARED_SLOT_COUNT)
+    )
+    event_manager = EventManager()
+    injecting = False
+
+    def _forward(event: Event):
+        if not injecting and not channel.send_event(event):
+            logger.warning(f"{name}: parent ring full, dropped {event.event_type.name}")
+
+    module = module_class(config)
+    module.set_event_manager(event_manager)
+    try:
+        module.initialize()
+        event_manager.add_listener(_forward)
+        channel.send((MSG_SUBSCRIBE, [event_type.value for event_type in event_manager.subscribed_types()]))
+        channel.send((MSG_READY,))
+
+        interval = module.get_update_interval()
+        while not stop_flag.is_set():
+            for kind, *payload in channel.receive():
+                if kind == MSG_EVENT:
+                    type_value, source, data = payload
+                    injecting = True
+                    event_manager.publish(Event(EventType(type_value), data, source))
+                    injecting = False
+
+            module.update()
+            event_manager.process_events()
+            child_notify.wait(interval)
+            child_notify.clear()
+    except Exception as e:
+        logger.error(f"{name}: child process failed: {e}", exc_info=True)
+        channel.send((MSG_ERROR, str(e)))
+    finally:
+        try:
+            module.shutdown()
+        finally:
+            channel.outbound.close()
+            channel.inbound.close()
+            channel.pool.close()
+            release_attachments()
+
+
+class ProcessModuleHost(BaseModule):
+
+    def __init__(self, module: BaseModule):
+        super().__init__(module.config)
+        self.module_class = type(module)
+        self._name = module.get_name()
+        self._process = None
+        self._channel: Optional[_Channel] = None
+        self._stop_flag = None
+        self._reader: Optional[threading.Thread] = None
+        self._pending_subscriptions: Optional[List[EventType]] = None
+        self._subscriptions: List[EventType] = []
+        self._ready = False
+        self._stopping = False
+        self._last_error: Optional[str] = None
+        self._restart_at: Optional[float] = None
+        self.restart_policy = RestartPolicy.from_config(module.config)
+        self.failed = False
+
+    def get_name(self) -> str:
+        return self._name
+
+    def get_update_interval(self) -> float:
+        return MONITOR_INTERVAL
+
+    def initialize(self):
+        logger.info(f"Starting {self._name} in a child process")
+        context = multiprocessing.get_context("spawn")
+        to_parent = SharedRingBuffer(capacity=RING_CAPACITY)
+        to_child = SharedRingBuffer(capacity=RING_CAPACITY)
+        parent_notify = context.Event()
+        child_notify = context.Event()
+        self._stop_flag = context.Event()
+        self._channel = _Channel(to_child, to_parent, child_notify)
+        self._stopping = False
+        self._last_error = None
+
+        self._process = context.Process(
+            target=_child_main,
+            args=(self.module_class, _config_snapshot(self.config), self._name,
+                  to_parent.name, to_child.name, parent_notify, child_notify, self._stop_flag),
+            name=f"ada-{self._name}",
+            daemon=True,
+        )
+        self._process.start()
+
+        self._reader = threading.Thread(
+            target=self._read_loop, args=(parent_notify,), name=f"{self._name}-reader", daemon=True
+        )
+        self._reader.start()
+        self._initialized = True
+
+    def _read_loop(self, parent_notify):
+        channel = self._channel
+        while not self._stop_flag.is_set():
+            parent_notify.wait(0.1)
+            parent_notify.clear()
+            for kind, *payload in channel.receive():
+                if kind == MSG_EVENT:
+                    type_value, source, data = payload
+                    self.event_manager.publish_threadsafe(Event(EventType(type_value), data, source))
+                elif kind == MSG_SUBSCRIBE:
+                    self._pending_subscriptions = [EventType(value) for value in payload[0]]
+                    self.request_update()
+                elif kind == MSG_READY:
+                    self._ready = True
+                    logger.info(f"Child process for {self._name} ready (pid {self._process.pid})")
+                elif kind == MSG_ERROR:
+                    self._last_error = payload[0]
+
+    def _forward(self, event: Event):
+        if event.source_module == self._name or not self._channel:
+            return
+        if not self._channel.send_event(event):
+            logger.warning(f"{self._name}: child ring full, dropped {event.event_type.name}")
+
+    def update(self):
+        if self._pending_subscriptions is not None:
+            for event_type in self._subscriptions:
+                self.event_manager.unsubscribe(event_type, self._forward)
+            self._subscriptions = self._pending_subscriptions
+            self._pending_subscriptions = None
+            for event_type in self._subscriptions:
+                self.event_manager.subscribe(event_type, self._forward)
+
+        if self.failed or self._stopping or self.is_alive() or self._process is None:
+            return
+
+        if self._restart_at is None:
+            error = self._last_error or f"exit code {self._process.exitcode}"
+            logger.error(f"Child process for {self._name} died: {error}")
+            self.event_manager.emit(
+                EventType.MODULE_ERROR,
+                data={"module": self._name, "error": error},
+                source=self._name
+            )
+            delay = self.restart_policy.next_delay()
+            if delay is None:
+                logger.error(f"Module {self._name} exceeded {self.restart_policy.max_restarts} restarts, giving up")
+                self.failed = True
+                self.shutdown()
+                return
+            logger.info(f"Restarting {self._name} in {delay:.1f}s")
+            self._restart_at = time.monotonic() + delay
+        elif time.monotonic() >= self._restart_at:
+            self._restart_at = None
+            self.restart_policy.record_restart()
+            self.shutdown()
+            self.initialize()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        # The wrapped module lives in the child; only the host side is visible here
+        return {"restarts_total": self.restart_policy.restarts, "alive": int(self.is_alive())}
+    
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def shutdown(self):
+        logger.info(f"Stopping child process for {self._name}")
+        self._stopping = True
+        for event_type in self._subscriptions:
+            self.event_manager.unsubscribe(event_type, self._forward)
+        self._subscriptions = []
+
+        if self._stop_flag:
+            self._stop_flag.set()
+        if self._channel:
+            self._channel.notify_remote.set()
+        if self._process:
+            self._process.join(JOIN_TIMEOUT)
+            if self._process.is_alive():
+                logger.warning(f"Child process for {self._name} did not stop, terminating")
+                self._process.terminate()
+                self._process.join()
+        if self._reader:
+            self._reader.join()
+        if self._channel:
+            self._channel.outbound.close()
+            self._channel.inbound.close()
+            self._channel = None
+        release_attachments()
+        self._ready = False
+        self._initialized = False
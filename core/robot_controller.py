@@ -1,7 +1,16 @@
 import logging
+import threading
 import time
-from typing import List, Dict
-from core.event_manager import EventManager, EventType
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Optional
+from core.event_manager import EventManager, EventType, Event
+from core.metrics_server import MetricsServer
+from core.module_runner import ExecutionMode, ThreadedModuleHost
+from core.scheduler import ModuleScheduler
+from core.startup import StartupTimer
+from utils import clock
+from utils.profiler import SamplingProfiler
+from core.watchdog import FrameWatchdog, SKIP_NON_CRITICAL
 from modules.base_module import BaseModule
 
 logger = logging.getLogger(__name__)
@@ -9,43 +18,211 @@ logger = logging.getLogger(__name__)
 
 class RobotController:
     
-    def __init__(self, config):
+    def __init__(self, config, boot_time: Optional[float] = None):
         self.config = config
-        self.event_manager = EventManager()
+        self.startup = StartupTimer(origin=boot_time)
+        self.event_manager = EventManager(
+            max_events_per_tick=config.EVENTS.MAX_EVENTS_PER_TICK,
+            dispatch_budget=config.EVENTS.DISPATCH_BUDGET,
+            instrument=config.EVENTS.INSTRUMENTATION,
+            stats_log_interval=config.EVENTS.STATS_LOG_INTERVAL
+        )
         self.modules: Dict[str, BaseModule] = {}
+        self.scheduler = ModuleScheduler()
+        self.watchdog: Optional[FrameWatchdog] = None
+        if config.WATCHDOG.ENABLED:
+            self.watchdog = FrameWatchdog(config.WATCHDOG, frame_budget=1.0 / config.DISPLAY.FPS)
+        self.profiler = SamplingProfiler(
+            interval=config.PROFILER.INTERVAL,
+            output_dir=config.PROFILER.OUTPUT_DIR,
+            max_duration=config.PROFILER.MAX_DURATION,
+            include_idle=config.PROFILER.INCLUDE_IDLE
+        )
+        self.metrics_server: Optional[MetricsServer] = None
         self.running = False
+        self._init_thread: Optional[threading.Thread] = None
+        self._init_locks: Dict[str, threading.Lock] = {}
+        
+        self.event_manager.subscribe(EventType.SYSTEM_SHUTDOWN, self._on_shutdown_event)
+        self.event_manager.subscribe(EventType.SYSTEM_PROFILE, self._on_profile_event)
         
         logger.info("Robot controller initialized")
     
-    def register_module(self, module: BaseModule):
+    def register_module(self, module: BaseModule, mode: Optional[ExecutionMode] = None):
+        if mode is None:
+            mode = ExecutionMode(getattr(module.config, 'EXECUTION_MODE', ExecutionMode.INLINE.value))
+        if mode != ExecutionMode.INLINE and module.REQUIRES_MAIN_THREAD:
+            logger.warning(f"Module {module.get_name()} must run on the main thread, ignoring {mode.value} mode")
+            mode = ExecutionMode.INLINE
+        
+        if mode == ExecutionMode.THREAD:
+            module = ThreadedModuleHost(module)
+        elif mode == ExecutionMode.PROCESS:
+            # multiprocessing and shared_memory are only paid for when used
+            from core.process_module import ProcessModuleHost
+            module = ProcessModuleHost(module)
+        
         module_name = module.get_name()
         if module_name in self.modules:
             logger.warning(f"Module {module_name} already registered, replacing")
         
         self.modules[module_name] = module
+        self._init_locks[module_name] = threading.Lock()
+        self.scheduler.add(module)
         module.set_event_manager(self.event_manager)
-        logger.info(f"Registered module: {module_name}")
+        logger.info(f"Registered module: {module_name} ({mode.value})")
     
     def initialize_modules(self):
-        for name, module in self.modules.items():
+        # Main-thread modules (the display) come up first so the eyes show
+        # immediately; everything else initializes concurrently in the background
+        eager = [m for m in self.modules.values() if m.REQUIRES_MAIN_THREAD]
+        background = [m for m in self.modules.values() if not m.REQUIRES_MAIN_THREAD]
+        
+        for module in eager:
+            if self._initialize_module(module):
+                self._present_first_frame(module)
+        
+        if not self.config.STARTUP.PARALLEL_INIT:
+            for module in self._dependency_order(background):
+                self._initialize_module(module)
+            self._finish_startup()
+            return
+        
+        self._init_thread = threading.Thread(
+            target=self._initialize_in_background, args=(background,),
+            name="module-init", daemon=True
+        )
+        self._init_thread.start()
+    
+    def _initialize_module(self, module: BaseModule) -> bool:
+        name = module.get_name()
+        with self._init_locks[name]:
+            if module.is_initialized():
+                return True
+            phase = f"init:{name}"
+            self.startup.start(phase)
             try:
                 logger.info(f"Initializing module: {name}")
                 module.initialize()
-                self.event_manager.emit(
+                self.event_manager.emit_threadsafe(
                     EventType.MODULE_READY,
                     data={"module": name},
                     source="controller"
                 )
+                return True
             except Exception as e:
                 logger.error(f"Failed to initialize module {name}: {e}", exc_info=True)
-                self.event_manager.emit(
+                self.event_manager.emit_threadsafe(
                     EventType.MODULE_ERROR,
                     data={"module": name, "error": str(e)},
                     source="controller"
                 )
+                return False
+            finally:
+                self.startup.stop(phase)
+    
+    def _present_first_frame(self, module: BaseModule):
+        try:
+            module.update()
+            self.scheduler.reschedule(module, clock.monotonic())
+        except Exception as e:
+            logger.error(f"Error updating module {module.get_name()}: {e}")
+        self.startup.mark("first_frame")
+        logger.info(f"First frame after {self.startup.elapsed('first_frame') * 1000:.0f} ms")
+    
+    def _dependencies(self, module: BaseModule) -> List[str]:
+        dependencies = []
+        for dependency in getattr(module.config, 'DEPENDS_ON', ()):
+            if dependency in self.modules:
+                dependencies.append(dependency)
+            else:
+                logger.warning(f"Module {module.get_name()} depends on unregistered module {dependency}")
+        return dependencies
+    
+    def _dependency_order(self, modules: List[BaseModule]) -> List[BaseModule]:
+        ordered, placed = [], {m.get_name() for m in self.modules.values() if m.REQUIRES_MAIN_THREAD}
+        remaining = list(modules)
+        while remaining:
+            ready = [m for m in remaining if all(d in placed for d in self._dependencies(m))]
+            if not ready:
+                logger.error(f"Dependency cycle between modules: {[m.get_name() for m in remaining]}")
+                return ordered
+            for module in ready:
+                ordered.append(module)
+                placed.add(module.get_name())
+                remaining.remove(module)
+        return ordered
+    
+    def _is_lazy(self, module: BaseModule) -> bool:
+        return getattr(module.config, 'LAZY_INIT', False)
+    
+    def _initialize_in_background(self, modules: List[BaseModule]):
+        eager = [m for m in modules if not self._is_lazy(m)]
+        lazy = [m for m in modules if self._is_lazy(m)]
+        
+        # A lazy module that an eager one depends on has to come up at boot after all
+        needed = {d for m in eager for d in self._dependencies(m)}
+        while any(m.get_name() in needed for m in lazy):
+            for module in [m for m in lazy if m.get_name() in needed]:
+                lazy.remove(module)
+                eager.append(module)
+                needed.update(self._dependencies(module))
+        
+        self._initialize_concurrently(eager)
+        self.startup.mark("modules_ready")
+        
+        # Lazy modules stay out of the boot path; get_module() brings one up early on demand
+        for module in self._dependency_order(lazy):
+            if not self.running:
+                break
+            self._initialize_module(module)
+        self._finish_startup()
+    
+    def _initialize_concurrently(self, modules: List[BaseModule]):
+        pending = {m.get_name(): m for m in modules}
+        finished = {name: m.is_initialized() for name, m in self.modules.items() if name not in pending}
+        running = {}
+        
+        with ThreadPoolExecutor(max_workers=self.config.STARTUP.INIT_WORKERS,
+                                thread_name_prefix="module-init") as executor:
+            while pending or running:
+                for name, module in list(pending.items()):
+                    dependencies = self._dependencies(module)
+                    if any(finished.get(d) is False for d in dependencies):
+                        logger.error(f"Skipping {name}: a dependency failed to initialize")
+                        finished[name] = False
+                        del pending[name]
+                    elif all(finished.get(d) for d in dependencies):
+                        running[executor.submit(self._initialize_module, module)] = name
+                        del pending[name]
+                
+                if not running:
+                    if pending:
+                        logger.error(f"Dependency cycle between modules: {list(pending)}")
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished[running.pop(future)] = future.result()
+    
+    def _finish_startup(self):
+        self.startup.mark("startup_complete")
+        if self.config.STARTUP.REPORT:
+            self.startup.log_report()
+    
+    def get_module(self, name: str) -> Optional[BaseModule]:
+        module = self.modules.get(name)
+        if module is not None and not module.is_initialized():
+            self._initialize_module(module)
+        return module
     
     def start(self):
         self.running = True
+        if self.config.PROFILER.SIGNAL:
+            self.profiler.install_signal_handler(self.config.PROFILER.SIGNAL)
+        if self.config.METRICS.ENABLED:
+            self.metrics_server = MetricsServer(self, self.config.METRICS)
+            self.metrics_server.start()
         self.initialize_modules()
         
         logger.info("Robot started")
@@ -59,23 +236,72 @@ class RobotController:
     
     def run(self):
         while self.running:
-            for module in self.modules.values():
-                if module.is_enabled():
-                    try:
-                        module.update()
-                    except Exception as e:
-                        logger.error(f"Error updating module {module.get_name()}: {e}")
+            self.tick()
             
-            self.event_manager.process_events()
-            
-            time.sleep(0.001)
+            # Sleep until the earliest module deadline or an incoming event
+            self.event_manager.wait(self.scheduler.time_until_next(clock.monotonic()))
+    
+    def tick(self):
+        watchdog = self.watchdog
+        if watchdog:
+            watchdog.begin_tick()
+        
+        now = clock.monotonic()
+        for module in self.scheduler.due(now):
+            if module.is_enabled() and module.is_initialized():
+                started = time.perf_counter()
+                try:
+                    module.update()
+                except Exception as e:
+                    logger.error(f"Error updating module {module.get_name()}: {e}")
+                if watchdog:
+                    watchdog.record(module.get_name(), time.perf_counter() - started)
+            self.scheduler.reschedule(module, now)
+        
+        started = time.perf_counter()
+        if self.event_manager.process_events() and watchdog:
+            watchdog.record("events", time.perf_counter() - started)
+        
+        if watchdog and watchdog.end_tick() is not None:
+            self._apply_degradation(watchdog.active_policies)
+    
+    def _apply_degradation(self, policies):
+        scale = self.config.WATCHDOG.NON_CRITICAL_INTERVAL_SCALE if SKIP_NON_CRITICAL in policies else 1
+        for name, module in self.modules.items():
+            if not module.CRITICAL:
+                self.scheduler.set_interval_scale(name, scale)
+            try:
+                module.apply_degradation(policies)
+            except Exception as e:
+                logger.error(f"Error degrading module {name}: {e}")
+    
+    def _on_shutdown_event(self, event: Event):
+        if self.running:
+            logger.info(f"Shutdown requested by {event.source_module}")
+            self.running = False
+    
+    def _on_profile_event(self, event: Event):
+        data = event.data or {}
+        action = data.get('action', 'toggle')
+        if action == 'start':
+            self.profiler.start(data.get('duration'))
+        elif action == 'stop':
+            self.profiler.stop()
+        else:
+            self.profiler.toggle(data.get('duration'))
     
     def shutdown(self):
         logger.info("Shutting down robot")
         self.running = False
         
+        if self.profiler.running:
+            self.profiler.stop(wait=True)
+        
+        if self._init_thread and self._init_thread.is_alive():
+            self._init_thread.join(self.config.STARTUP.INIT_TIMEOUT)
+        
         self.event_manager.emit(EventType.SYSTEM_SHUTDOWN, source="controller")
-        self.event_manager.process_events()
+        self.event_manager.drain()
         
         for name, module in self.modules.items():
             try:
@@ -84,4 +310,7 @@ class RobotController:
             except Exception as e:
                 logger.error(f"Error shutting down module {name}: {e}")
         
+        if self.metrics_server:
+            self.metrics_server.stop()
+        
         logger.info("Robot shutdown complete")
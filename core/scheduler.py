@@ -0,0 +1,59 @@
+from typing import Dict, List, Optional
+from modules.base_module import BaseModule
+from utils import clock
+
+
+class ModuleScheduler:
+    
+    def __init__(self, max_sleep: float = 1.0):
+        self.max_sleep = max_sleep
+        self._modules: Dict[str, BaseModule] = {}
+        self._deadlines: Dict[str, float] = {}
+        self._interval_scales: Dict[str, float] = {}
+    
+    def add(self, module: BaseModule, now: Optional[float] = None):
+        name = module.get_name()
+        self._modules[name] = module
+        self._deadlines[name] = clock.monotonic() if now is None else now
+    
+    def remove(self, name: str):
+        self._modules.pop(name, None)
+        self._deadlines.pop(name, None)
+        self._interval_scales.pop(name, None)
+    
+    def set_interval_scale(self, name: str, scale: float):
+        if scale == 1:
+            self._interval_scales.pop(name, None)
+        else:
+            self._interval_scales[name] = scale
+    
+    def due(self, now: float) -> List[BaseModule]:
+        due = []
+        for name, module in self._modules.items():
+            if module._update_requested or now >= self._deadlines[name]:
+                module._update_requested = False
+                due.append(module)
+        return due
+    
+    def reschedule(self, module: BaseModule, now: float):
+        name = module.get_name()
+        deadline = module.get_next_update_time(now)
+        if deadline is None:
+            # Keep a steady cadence, but never try to catch up on missed ticks
+            interval = module.get_update_interval() * self._interval_scales.get(name, 1)
+            deadline = max(self._deadlines[name] + interval, now)
+        self._deadlines[name] = deadline
+    
+    def next_deadline(self) -> Optional[float]:
+        return min(self._deadlines.values()) if self._deadlines else None
+    
+    def time_until_next(self, now: float) -> float:
+        if any(module._update_requested for module in self._modules.values()):
+            return 0.0
+        deadline = self.next_deadline()
+        if deadline is None:
+            return self.max_sleep
+        return min(max(deadline - now, 0.0), self.max_sleep)
+    
+    def get_deadlines(self) -> Dict[str, float]:
+        return dict(self._deadlines)
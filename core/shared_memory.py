@@ -0,0 +1,186 @@
+import logging
+import struct
+import sys
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _numpy():
+    # numpy is optional and slow to import; an ndarray can only exist once it is loaded
+    numpy = sys.modules.get("numpy")
+    if numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+    return numpy
+
+
+class SharedRingBuffer:
+    # Single-producer/single-consumer byte ring. The header holds the capacity
+    # and two ever-increasing positions; each side only ever writes its own.
+    HEADER = struct.Struct("<QQQ")
+    CAPACITY_OFFSET = 0
+    HEAD_OFFSET = 8
+    TAIL_OFFSET = 16
+    POSITION = struct.Struct("<Q")
+    LENGTH = struct.Struct("<I")
+    WRAP_MARKER = 0xFFFFFFFF
+
+    def __init__(self, name: Optional[str] = None, capacity: int = 1 << 20):
+        if name is None:
+            self._shm = SharedMemory(create=True, size=self.HEADER.size + capacity)
+            self.HEADER.pack_into(self._shm.buf, 0, capacity, 0, 0)
+            self._owner = True
+        else:
+            self._shm = SharedMemory(name=name)
+            self._owner = False
+        self.capacity = self.POSITION.unpack_from(self._shm.buf, self.CAPACITY_OFFSET)[0]
+        self._data = self._shm.buf[self.HEADER.size:self.HEADER.size + self.capacity]
+        self.dropped = 0
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def _load(self, offset: int) -> int:
+        return self.POSITION.unpack_from(self._shm.buf, offset)[0]
+
+    def _store(self, offset: int, value: int):
+        self.POSITION.pack_into(self._shm.buf, offset, value)
+
+    def write(self, payload: bytes) -> bool:
+        needed = self.LENGTH.size + len(payload)
+        head = self._load(self.HEAD_OFFSET)
+        free = self.capacity - (head - self._load(self.TAIL_OFFSET))
+        index = head % self.capacity
+        contiguous = self.capacity - index
+
+        if contiguous < needed:
+            if free < contiguous + needed:
+                self.dropped += 1
+                return False
+            if contiguous >= self.LENGTH.size:
+                self.LENGTH.pack_into(self._data, index, self.WRAP_MARKER)
+            head += contiguous
+            index = 0
+        elif free < needed:
+            self.dropped += 1
+            return False
+
+        self.LENGTH.pack_into(self._data, index, len(payload))
+        self._data[index + self.LENGTH.size:index + needed] = payload
+        # Publish the record only after its bytes are in place
+        self._store(self.HEAD_OFFSET, head + needed)
+        return True
+
+    def read(self) -> Optional[bytes]:
+        tail = self._load(self.TAIL_OFFSET)
+        if tail == self._load(self.HEAD_OFFSET):
+            return None
+
+        index = tail % self.capacity
+        contiguous = self.capacity - index
+        if (contiguous < self.LENGTH.size or
+                self.LENGTH.unpack_from(self._data, index)[0] == self.WRAP_MARKER):
+            tail += contiguous
+            index = 0
+
+        (length,) = self.LENGTH.unpack_from(self._data, index)
+        start = index + self.LENGTH.size
+        payload = bytes(self._data[start:start + length])
+        self._store(self.TAIL_OFFSET, tail + self.LENGTH.size + length)
+        return payload
+
+    def read_all(self) -> List[bytes]:
+        records = []
+        payload = self.read()
+        while payload is not None:
+            records.append(payload)
+            payload = self.read()
+        return records
+
+    def close(self):
+        self._data.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+@dataclass(frozen=True)
+class SharedFrame:
+    # Handle to a payload living in a shared-memory slot. Slots are recycled
+    # round-robin by the producer, so copy the data if it must outlive the tick.
+    segment: str
+    nbytes: int
+    shape: Optional[Tuple[int, ...]] = None
+    dtype: Optional[str] = None
+
+    def buffer(self) -> memoryview:
+        return _attach(self.segment).buf[:self.nbytes]
+
+    def array(self):
+        np = _numpy()
+        if np is None:
+            raise RuntimeError("numpy is required to view shared frames as arrays")
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=self.buffer())
+
+    def tobytes(self) -> bytes:
+        return bytes(self.buffer())
+
+
+_attachments: Dict[str, SharedMemory] = {}
+
+
+def _attach(name: str) -> SharedMemory:
+    segment = _attachments.get(name)
+    if segment is None:
+        segment = _attachments[name] = SharedMemory(name=name)
+    return segment
+
+
+def release_attachments():
+    for segment in _attachments.values():
+        try:
+            segment.close()
+        except BufferError:
+            logger.warning(f"Shared segment {segment.name} still referenced on release")
+    _attachments.clear()
+
+
+class SharedSlotPool:
+
+    def __init__(self, slot_size: int, slot_count: int = 4):
+        self.slot_size = slot_size
+        self.slot_count = slot_count
+        self._slots: List[SharedMemory] = []
+        self._next = 0
+
+    def put(self, value) -> Optional[SharedFrame]:
+        np = sys.modules.get("numpy")
+        if np is not None and isinstance(value, np.ndarray):
+            if not value.flags.c_contiguous:
+                value = np.ascontiguousarray(value)
+            shape, dtype, raw = value.shape, value.dtype.str, memoryview(value).cast("B")
+        else:
+            shape, dtype, raw = None, None, memoryview(value).cast("B")
+
+        if raw.nbytes > self.slot_size:
+            return None
+
+        if len(self._slots) < self.slot_count:
+            self._slots.append(SharedMemory(create=True, size=self.slot_size))
+        slot = self._slots[self._next % len(self._slots)]
+        self._next += 1
+
+        slot.buf[:raw.nbytes] = raw
+        return SharedFrame(slot.name, raw.nbytes, shape, dtype)
+
+    def close(self):
+        for slot in self._slots:
+            slot.close()
+            slot.unlink()
+        self._slots.clear()
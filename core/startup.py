@@ -0,0 +1,63 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = time.monotonic() if origin is None else origin
+        self._phases: Dict[str, Tuple[float, Optional[float]]] = {}
+        self._marks: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def start(self, phase: str):
+        with self._lock:
+            self._phases[phase] = (time.monotonic(), None)
+    
+    def stop(self, phase: str):
+        with self._lock:
+            started, _ = self._phases[phase]
+            self._phases[phase] = (started, time.monotonic())
+    
+    def record(self, phase: str, started: float, finished: float):
+        with self._lock:
+            self._phases[phase] = (started, finished)
+    
+    def mark(self, name: str):
+        with self._lock:
+            self._marks.setdefault(name, time.monotonic())
+    
+    def elapsed(self, name: str) -> Optional[float]:
+        mark = self._marks.get(name)
+        return mark - self.origin if mark is not None else None
+    
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            phases = {
+                phase: {
+                    "start": started - self.origin,
+                    "duration": (finished - started) if finished is not None else None,
+                }
+                for phase, (started, finished) in self._phases.items()
+            }
+            marks = {name: mark - self.origin for name, mark in self._marks.items()}
+        return {"phases": phases, "marks": marks}
+    
+    def format_report(self) -> List[str]:
+        snapshot = self.snapshot()
+        lines = ["Startup timing (ms since boot):"]
+        for phase, timing in sorted(snapshot["phases"].items(), key=lambda item: item[1]["start"]):
+            duration = timing["duration"]
+            duration_text = f"{duration * 1000:8.1f}" if duration is not None else "     ..."
+            lines.append(f"  {timing['start'] * 1000:8.1f} +{duration_text}  {phase}")
+        for name, mark in sorted(snapshot["marks"].items(), key=lambda item: item[1]):
+            lines.append(f"  {mark * 1000:8.1f}            {name}")
+        return lines
+    
+    def log_report(self):
+        for line in self.format_report():
+            logger.info(line)
@@ -0,0 +1,108 @@
+import logging
+import time
+from collections import deque
+from typing import Dict, FrozenSet, List, Optional
+from utils.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+SKIP_NON_CRITICAL = "skip_non_critical"
+REDUCE_EFFECTS = "reduce_effects"
+REDUCE_FPS = "reduce_fps"
+
+LOG_INTERVAL = 5.0
+
+
+class FrameWatchdog:
+    
+    def __init__(self, config, frame_budget: float):
+        self.config = config
+        self.frame_budget = config.FRAME_BUDGET or frame_budget
+        self.module_budgets: Dict[str, float] = dict(config.MODULE_BUDGETS)
+        self.policies: List[str] = list(config.DEGRADATION_POLICIES)
+        self.level = 0
+        
+        self.tick_cost = Histogram()
+        self.module_costs: Dict[str, Histogram] = {}
+        self.overrun_counts: Dict[str, int] = {}
+        self._window = deque(maxlen=config.WINDOW)
+        self._window_overruns = 0
+        self._good_ticks = 0
+        self._costs: Dict[str, float] = {}
+        self._last_log = 0.0
+    
+    @property
+    def active_policies(self) -> FrozenSet[str]:
+        return frozenset(self.policies[:self.level])
+    
+    def begin_tick(self):
+        self._costs.clear()
+    
+    def record(self, name: str, seconds: float):
+        self._costs[name] = self._costs.get(name, 0.0) + seconds
+        histogram = self.module_costs.get(name)
+        if histogram is None:
+            histogram = self.module_costs[name] = Histogram()
+        histogram.observe(seconds)
+    
+    def end_tick(self) -> Optional[int]:
+        # Returns the new degradation level when it changes
+        if not self._costs:
+            return None
+        
+        total = sum(self._costs.values())
+        self.tick_cost.observe(total)
+        over_budget = [
+            name for name, cost in self._costs.items()
+            if cost > self.module_budgets.get(name, self.frame_budget)
+        ]
+        overrun = total > self.frame_budget or bool(over_budget)
+        
+        if len(self._window) == self._window.maxlen:
+            self._window_overruns -= self._window[0]
+        self._window.append(overrun)
+        self._window_overruns += overrun
+        
+        if not overrun:
+            self._good_ticks += 1
+            if self.level and self._good_ticks >= self.config.RECOVERY_TICKS:
+                return self._set_level(self.level - 1, "recovered")
+            return None
+        
+        self._good_ticks = 0
+        culprit = max(self._costs, key=self._costs.get)
+        self.overrun_counts[culprit] = self.overrun_counts.get(culprit, 0) + 1
+        
+        now = time.monotonic()
+        if now - self._last_log >= LOG_INTERVAL:
+            self._last_log = now
+            logger.warning(
+                f"Tick took {total * 1000:.1f} ms (budget {self.frame_budget * 1000:.1f} ms), "
+                f"worst module: {culprit} {self._costs[culprit] * 1000:.1f} ms"
+            )
+        
+        if self._window_overruns >= self.config.OVERRUN_THRESHOLD and self.level < len(self.policies):
+            return self._set_level(self.level + 1, f"repeated overruns, mostly caused by {culprit}")
+        return None
+    
+    def _set_level(self, level: int, reason: str) -> int:
+        previous = self.level
+        self.level = level
+        self._window.clear()
+        self._window_overruns = 0
+        self._good_ticks = 0
+        if level > previous:
+            logger.warning(f"Degrading to level {level} ({self.policies[level - 1]}): {reason}")
+        else:
+            logger.info(f"Restoring to level {level}: {reason}")
+        return level
+    
+    def snapshot(self) -> Dict:
+        return {
+            "level": self.level,
+            "policies": sorted(self.active_policies),
+            "frame_budget": self.frame_budget,
+            "tick_cost": self.tick_cost.snapshot(),
+            "modules": {name: hist.snapshot() for name, hist in self.module_costs.items()},
+            "overruns": dict(self.overrun_counts),
+        }
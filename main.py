@@ -1,11 +1,18 @@
+import time
+BOOT_TIME = time.monotonic()
+
+import argparse
 import logging
+import random
 import sys
 import os
 from dotenv import load_dotenv
 from config import RobotConfig
 from core.robot_controller import RobotController
-from modules.display.display_module import DisplayModule
-from modules.network.network_module import NetworkModule
+from core.event_recorder import EventRecorder
+from modules.registry import create_enabled_modules
+from utils.import_profiler import ImportProfiler
+IMPORTS_DONE = time.monotonic()
 
 load_dotenv()
 
@@ -39,25 +46,48 @@ def load_config_from_env():
         if not RobotConfig.NETWORK.VALORANT_TAG:
             logger.info("   Missing: VALORANT_TAG")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ada robot")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record the event stream to a binary log for replay")
+    parser.add_argument("--import-report", action="store_true",
+                        default=RobotConfig.STARTUP.IMPORT_REPORT,
+                        help="log a -X importtime style report for the enabled modules")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     logger.info("=== Starting Ada ===")
 
     load_config_from_env()
     
-    controller = RobotController(RobotConfig)
+    controller = RobotController(RobotConfig, boot_time=BOOT_TIME)
+    controller.startup.record("imports", BOOT_TIME, IMPORTS_DONE)
+
+    recorder = None
+    if args.record:
+        seed = random.randrange(2 ** 32)
+        random.seed(seed)
+        recorder = EventRecorder(args.record, seed=seed)
+        recorder.attach(controller.event_manager)
     
-    display_module = DisplayModule(RobotConfig.DISPLAY)
-    controller.register_module(display_module)
+    if args.import_report:
+        with ImportProfiler() as profiler:
+            modules = create_enabled_modules(RobotConfig, controller.startup)
+        profiler.log_report(min_cumulative=RobotConfig.STARTUP.IMPORT_REPORT_THRESHOLD)
+    else:
+        modules = create_enabled_modules(RobotConfig, controller.startup)
 
-    if 'network' in RobotConfig.ENABLED_MODULES:
-        network_module = NetworkModule(RobotConfig.NETWORK)
-        controller.register_module(network_module)
+    for module in modules:
+        controller.register_module(module)
     
     try:
         controller.start()
     except Exception as e:
         logger.error(f"Fatal error: {e}", exc_info=True)
     finally:
+        if recorder:
+            recorder.close()
         logger.info("=== Ada Stopped ===")
 
 
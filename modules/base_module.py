@@ -1,17 +1,24 @@
 from abc import ABC, abstractmethod
+from typing import Any, Dict, FrozenSet, Optional
 from core.event_manager import EventManager
 import logging
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_UPDATE_INTERVAL = 0.01
+
 
 class BaseModule(ABC):
     
+    REQUIRES_MAIN_THREAD = False
+    CRITICAL = False
+    
     def __init__(self, config):
         self.config = config
         self.event_manager: EventManager = None
         self._enabled = True
         self._initialized = False
+        self._update_requested = False
     
     @abstractmethod
     def get_name(self) -> str:
@@ -29,6 +36,28 @@ class BaseModule(ABC):
     def shutdown(self):
         pass
     
+    def get_update_interval(self) -> float:
+        rate = getattr(self.config, 'UPDATE_RATE', None)
+        return 1.0 / rate if rate else DEFAULT_UPDATE_INTERVAL
+    
+    def get_next_update_time(self, now: float) -> Optional[float]:
+        # Override to declare an absolute deadline instead of a fixed rate
+        return None
+    
+    def apply_degradation(self, policies: FrozenSet[str]):
+        # Called by the frame watchdog whenever the set of active policies changes
+        pass
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        # Exported by the metrics endpoint as ada_<module>_<key>: Histogram values
+        # become histograms, keys ending in _total counters, anything else a gauge
+        return {}
+    
+    def request_update(self):
+        self._update_requested = True
+        if self.event_manager:
+            self.event_manager.wakeup()
+    
     def set_event_manager(self, event_manager: EventManager):
         self.event_manager = event_manager
     
@@ -14,6 +14,9 @@ class CameraModule(BaseModule):
     def get_name(self) -> str:
         return "camera"
     
+    def get_update_interval(self) -> float:
+        return 1.0 / self.config.FPS
+    
     def initialize(self):
         logger.info("Initializing camera module")
         # TODO: Initialize camera (e.g., picamera2, opencv)
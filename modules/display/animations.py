@@ -1,6 +1,15 @@
-import time
+import ast
+import logging
+import math
+import operator
+from bisect import bisect_right
+from functools import lru_cache
+from utils.clock import now
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
 
 
 class AnimationType(Enum):
@@ -17,20 +26,299 @@ class AnimationState:
     is_active: bool = False
     start_time: float = 0
     duration: float = 0
-    
-    def start(self, duration: float):
+
+    def start(self, duration: float, at: Optional[float] = None):
         self.is_active = True
-        self.start_time = time.time()
+        self.start_time = now() if at is None else at
         self.duration = duration
-    
+
     def stop(self):
         self.is_active = False
-    
-    def get_progress(self) -> float:
+
+    def get_progress(self, at: Optional[float] = None) -> float:
+        # `at` is the frame's clock sample, so every track in a frame sees the same time
         if not self.is_active:
             return 0.0
-        elapsed = time.time() - self.start_time
+        elapsed = (now() if at is None else at) - self.start_time
         return min(elapsed / self.duration, 1.0) if self.duration > 0 else 1.0
-    
-    def is_finished(self) -> bool:
-        return self.is_active and self.get_progress() >= 1.0
+
+    def is_finished(self, at: Optional[float] = None) -> bool:
+        return self.is_active and self.get_progress(at) >= 1.0
+
+
+def _smoothstep(t: float) -> float:
+    return t * t * (3.0 - 2.0 * t)
+
+
+EASING_RESOLUTION = 256
+
+EASING_FUNCTIONS: Dict[str, Callable[[float], float]] = {
+    "linear": lambda t: t,
+    "ease_in_out": _smoothstep,
+    "ease_in_out_twice": lambda t: _smoothstep(_smoothstep(t)),
+    "ease_in": lambda t: t * t,
+    "ease_out": lambda t: t * (2.0 - t),
+}
+
+
+class LookupTable:
+    # A curve over [0, 1] sampled once; reading it is an index and a lerp
+    # however expensive the curve was to compute
+
+    def __init__(self, function: Callable[[float], float], resolution: int = EASING_RESOLUTION):
+        self.resolution = resolution
+        self.values = [function(i / resolution) for i in range(resolution + 1)]
+
+    def __call__(self, t: float) -> float:
+        if t <= 0.0:
+            return self.values[0]
+        if t >= 1.0:
+            return self.values[-1]
+        position = t * self.resolution
+        index = int(position)
+        low = self.values[index]
+        return low + (self.values[index + 1] - low) * (position - index)
+
+
+EASINGS: Dict[str, LookupTable] = {name: LookupTable(function) for name, function in EASING_FUNCTIONS.items()}
+
+Value = Union[float, str]
+
+
+_BINARY_OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+_UNARY_OPERATORS = {ast.USub: operator.neg, ast.UAdd: operator.pos}
+
+
+@lru_cache(maxsize=None)
+def parse_expression(source: str) -> ast.expr:
+    # Keyframe expressions are plain arithmetic: numbers, variable names,
+    # + - * / and a sign. Anything else is rejected instead of being run.
+    try:
+        tree = ast.parse(source.strip(), "<keyframe>", "eval").body
+    except SyntaxError as e:
+        raise ValueError(f"invalid expression {source!r}: {e.msg}") from None
+    for node in ast.walk(tree):
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            continue
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+            continue
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            continue
+        if isinstance(node, (ast.Name, ast.Load, *_BINARY_OPERATORS, *_UNARY_OPERATORS)):
+            continue
+        raise ValueError(f"unsupported expression {source!r}, only numbers, names and + - * / are allowed")
+    return tree
+
+
+def expression_names(value: Value) -> List[str]:
+    # Variables a keyframe value refers to
+    if isinstance(value, (int, float)):
+        return []
+    return [node.id for node in ast.walk(parse_expression(value)) if isinstance(node, ast.Name)]
+
+
+def _evaluate_node(node: ast.expr, variables: Dict[str, float]) -> float:
+    if isinstance(node, ast.Constant):
+        return float(node.value)
+    if isinstance(node, ast.Name):
+        if node.id not in variables:
+            raise ValueError(f"unknown variable {node.id!r}")
+        return float(variables[node.id])
+    if isinstance(node, ast.UnaryOp):
+        return _UNARY_OPERATORS[type(node.op)](_evaluate_node(node.operand, variables))
+    return _BINARY_OPERATORS[type(node.op)](_evaluate_node(node.left, variables),
+                                            _evaluate_node(node.right, variables))
+
+
+def evaluate(value: Value, variables: Dict[str, float]) -> float:
+    # Keyframe values are numbers or arithmetic over the eye's base geometry,
+    # e.g. "height * 0.6"; they are resolved once when a timeline is bound
+    if isinstance(value, (int, float)):
+        return float(value)
+    return _evaluate_node(parse_expression(value), variables)
+
+
+@dataclass
+class Keyframe:
+    time: float  # progress in [0, 1]
+    value: Value
+    easing: str = "linear"  # curve of the segment arriving at this keyframe
+
+
+class BoundTrack:
+
+    def __init__(self, times: List[float], values: List[float], easings: List[LookupTable]):
+        self.times = times
+        self.values = values
+        self.easings = easings
+
+    def sample(self, progress: float) -> float:
+        index = bisect_right(self.times, progress)
+        if index == 0:
+            return self.values[0]
+        if index == len(self.times):
+            return self.values[-1]
+        start, end = self.times[index - 1], self.times[index]
+        t = self.easings[index]((progress - start) / (end - start))
+        low = self.values[index - 1]
+        return low + (self.values[index] - low) * t
+
+
+class CurveTrack:
+    # A whole track precomputed into one lookup table, for shapes that keyframes
+    # would only approximate such as a decaying oscillation
+
+    def __init__(self, table: LookupTable):
+        self.table = table
+
+    def sample(self, progress: float) -> float:
+        return self.table(progress)
+
+
+@dataclass
+class Track:
+    property: str
+    keyframes: List[Keyframe] = field(default_factory=list)
+    oscillate: Optional[Dict[str, Value]] = None
+
+    def bind(self, variables: Dict[str, float]):
+        if self.oscillate is not None:
+            return CurveTrack(self._oscillation(variables))
+        keyframes = sorted(self.keyframes, key=lambda keyframe: keyframe.time)
+        return BoundTrack([keyframe.time for keyframe in keyframes],
+                          [evaluate(keyframe.value, variables) for keyframe in keyframes],
+                          [EASINGS[keyframe.easing] for keyframe in keyframes])
+
+    def validate(self, variables: Iterable[str]):
+        # Raises ValueError for anything bind() would otherwise trip over mid-animation
+        if self.oscillate is not None:
+            unknown = set(self.oscillate) - {"cycles", "amplitude", "decay", "easing"}
+            if unknown:
+                raise ValueError(f"{self.property}: unknown oscillate settings {sorted(unknown)}")
+            values = [self.oscillate.get(name, 0) for name in ("cycles", "amplitude", "decay")]
+            easings = [self.oscillate.get("easing", "linear")]
+        else:
+            if not self.keyframes:
+                raise ValueError(f"{self.property}: no keyframes")
+            for keyframe in self.keyframes:
+                if type(keyframe.time) not in (int, float) or not 0.0 <= keyframe.time <= 1.0:
+                    raise ValueError(f"{self.property}: keyframe time {keyframe.time!r} is not in [0, 1]")
+            values = [keyframe.value for keyframe in self.keyframes]
+            easings = [keyframe.easing for keyframe in self.keyframes]
+
+        for easing in easings:
+            if easing not in EASINGS:
+                raise ValueError(f"{self.property}: unknown easing {easing!r}, expected one of {sorted(EASINGS)}")
+        for value in values:
+            if type(value) not in (int, float, str):
+                raise ValueError(f"{self.property}: value {value!r} is not a number or an expression")
+            for name in expression_names(value):
+                if name not in variables:
+                    raise ValueError(f"{self.property}: unknown variable {name!r} in {value!r}")
+
+    def _oscillation(self, variables: Dict[str, float]) -> LookupTable:
+        # sin(easing(p) * cycles * 2pi) * amplitude, fading linearly by `decay` over the animation
+        spec = self.oscillate
+        cycles = evaluate(spec.get("cycles", 1), variables)
+        amplitude = evaluate(spec.get("amplitude", 1), variables)
+        decay = evaluate(spec.get("decay", 0), variables)
+        easing = EASING_FUNCTIONS[spec.get("easing", "linear")]
+        return LookupTable(lambda p: math.sin(easing(p) * cycles * 2 * math.pi) * amplitude * (1.0 - p * decay))
+
+
+class BoundTimeline:
+
+    def __init__(self, name: str, duration: Optional[float], tracks: List[Tuple[str, object]]):
+        self.name = name
+        self.duration = duration
+        self.tracks = tracks
+        self.properties = [name for name, _ in tracks]
+
+    def sample(self, progress: float) -> Dict[str, float]:
+        return {name: track.sample(progress) for name, track in self.tracks}
+
+
+@dataclass
+class Timeline:
+    name: str
+    tracks: List[Track]
+    duration: Optional[float] = None  # seconds; None leaves it to whoever starts the animation
+
+    def bind(self, variables: Dict[str, float]) -> BoundTimeline:
+        return BoundTimeline(self.name, self.duration, [(track.property, track.bind(variables))
+                                                        for track in self.tracks])
+
+    def validate(self, properties: Iterable[str], variables: Iterable[str]):
+        properties, variables = set(properties), set(variables)
+        if self.duration is not None and (type(self.duration) not in (int, float) or self.duration <= 0):
+            raise ValueError(f"duration {self.duration!r} is not a positive number of seconds")
+        if not self.tracks:
+            raise ValueError("no tracks")
+        for track in self.tracks:
+            if track.property not in properties:
+                raise ValueError(f"unknown property {track.property!r}, expected one of {sorted(properties)}")
+            track.validate(variables)
+
+    @classmethod
+    def from_spec(cls, name: str, spec: dict) -> "Timeline":
+        # {"duration": 0.5, "tracks": {"height": [[0, "height"], [0.5, 0, "ease_in_out"], ...],
+        #                              "offset_x": {"oscillate": {"cycles": 2, "amplitude": 20}}}}
+        if not isinstance(spec, dict) or not isinstance(spec.get("tracks"), dict):
+            raise ValueError('expected {"duration": seconds, "tracks": {property: keyframes, ...}}')
+        tracks = []
+        for property_name, track in spec["tracks"].items():
+            if isinstance(track, dict):
+                if not isinstance(track.get("oscillate"), dict):
+                    raise ValueError(f"{property_name}: expected keyframes or an oscillate block")
+                tracks.append(Track(property_name, oscillate=track["oscillate"]))
+            elif isinstance(track, (list, tuple)) and all(isinstance(keyframe, (list, tuple))
+                                                          and 2 <= len(keyframe) <= 3 for keyframe in track):
+                tracks.append(Track(property_name, [Keyframe(*keyframe) for keyframe in track]))
+            else:
+                raise ValueError(f"{property_name}: keyframes are [time, value] or [time, value, easing]")
+        return cls(name, tracks, spec.get("duration"))
+
+
+# Built-in expressions. Eye tracks are evaluated against the eye's base
+# geometry: width, height and radius (the resting corner radius).
+# Properties: height, top_radius, bottom_radius, scale (heart) for an eye,
+# offset_x and offset_y (added to the look target) for both eyes together.
+TIMELINE_SPECS = {
+    "blink": {"tracks": {
+        "height": [[0.0, "height"], [0.5, 0.0], [1.0, "height"]],
+    }},
+    "smile": {"tracks": {
+        "height": [[0.0, "height"], [1 / 3, "height * 0.6", "ease_in_out"],
+                   [2 / 3, "height * 0.6"], [1.0, "height", "ease_in_out"]],
+        "top_radius": [[0.0, "radius"], [1 / 3, "height * 0.6 * 0.8", "ease_in_out"],
+                       [2 / 3, "height * 0.6 * 0.8"], [1.0, "radius", "ease_in_out"]],
+        "bottom_radius": [[0.0, "radius"], [1 / 3, "radius * 0.5", "ease_in_out"],
+                          [2 / 3, "radius * 0.5"], [1.0, "radius", "ease_in_out"]],
+    }},
+    "heart": {"tracks": {
+        "scale": [[0.0, 0.0], [0.3, 1.0, "ease_in_out"], [1.0, 1.0]],
+    }},
+    "shake": {"tracks": {
+        "offset_x": {"oscillate": {"cycles": 2, "amplitude": 50, "decay": 0.7, "easing": "ease_in_out_twice"}},
+    }},
+    "nod": {"tracks": {
+        "offset_y": {"oscillate": {"cycles": 2, "amplitude": 35, "decay": 0.3, "easing": "ease_in_out"}},
+    }},
+}
+
+
+def load_timelines(extra_specs: Optional[dict] = None, properties: Iterable[str] = (),
+                   variables: Iterable[str] = ()) -> Dict[str, Timeline]:
+    # Built-ins are trusted; extra specs come from the config and are checked
+    # against the properties and variables the caller can drive, a bad one is
+    # dropped with one log line instead of failing the first time it plays
+    timelines = {name: Timeline.from_spec(name, spec) for name, spec in TIMELINE_SPECS.items()}
+    for name, spec in (extra_specs or {}).items():
+        try:
+            timeline = Timeline.from_spec(name, spec)
+            timeline.validate(properties, variables)
+        except ValueError as e:
+            logger.error(f"Ignoring expression {name!r}: {e}")
+            continue
+        timelines[name] = timeline
+    return timelines
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+import pygame
+
+logger = logging.getLogger(__name__)
+
+ATLAS_VERSION = 2
+INDEX_SUFFIX = ".json"
+
+
+def _to_key(value) -> Hashable:
+    # JSON turns the tuple keys into lists, turn them back
+    if isinstance(value, list):
+        return tuple(_to_key(item) for item in value)
+    return value
+
+
+def config_fingerprint(config) -> str:
+    # Sprite keys describe their shapes, this only guards against atlases baked
+    # by another rasterizer or for another eye so they are not silently half-used
+    parts = (ATLAS_VERSION, pygame.version.ver, config.SPRITE_QUANTUM,
+             config.EYE_WIDTH, config.EYE_HEIGHT, tuple(config.EYE_COLOR), tuple(config.HEART_COLOR))
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+def write_atlas(path: str, sprites: Iterable[Tuple[Hashable, pygame.Surface]], fingerprint: str) -> int:
+    # Pixels are stored raw and back to back so the loader can wrap them without decoding
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    entries = []
+    offset = 0
+    with open(path, "wb") as f:
+        for key, surface in sprites:
+            colorkey = surface.get_colorkey()
+            mode = "RGBA" if colorkey is None else "RGB"
+            data = pygame.image.tobytes(surface, mode)
+            f.write(data)
+            entries.append({
+                "key": key,
+                "offset": offset,
+                "size": surface.get_size(),
+                "mode": mode,
+                "colorkey": colorkey[:3] if colorkey is not None else None,
+            })
+            offset += len(data)
+    with open(path + INDEX_SUFFIX, "w") as f:
+        json.dump({"version": ATLAS_VERSION, "fingerprint": fingerprint, "entries": entries}, f)
+    return offset
+
+
+class SpriteAtlas:
+    # Pre-rendered sprites baked by tools/bake_atlas.py. The pixel file is
+    # memory-mapped and each sprite wraps its slice of the mapping on first
+    # use, so startup only parses the index and only used sprites are paged in.
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0
+        self._entries: Dict[Hashable, dict] = {}
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str) -> Optional["SpriteAtlas"]:
+        # Returns None when there is no usable atlas, callers then draw procedurally
+        if not os.path.exists(path) or not os.path.exists(path + INDEX_SUFFIX):
+            logger.info(f"No sprite atlas at {path}, drawing procedurally")
+            return None
+        atlas = cls(path)
+        try:
+            atlas.open(fingerprint)
+        except Exception as e:
+            logger.warning(f"Ignoring sprite atlas {path}: {e}")
+            atlas.close()
+            return None
+        logger.info(f"Loaded sprite atlas {path} with {len(atlas)} sprites")
+        return atlas
+
+    def open(self, fingerprint: str):
+        with open(self.path + INDEX_SUFFIX) as f:
+            index = json.load(f)
+        if index.get("version") != ATLAS_VERSION or index.get("fingerprint") != fingerprint:
+            raise ValueError("baked for a different configuration, run tools/bake_atlas.py")
+
+        self._file = open(self.path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        for entry in index["entries"]:
+            width, height = entry["size"]
+            length = width * height * len(entry["mode"])
+            if entry["offset"] + length > size:
+                raise ValueError("pixel file is shorter than its index")
+            self._entries[_to_key(entry["key"])] = entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[pygame.Surface]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        width, height = entry["size"]
+        start = entry["offset"]
+        view = memoryview(self._map)[start:start + width * height * len(entry["mode"])]
+        sprite = pygame.image.frombuffer(view, (width, height), entry["mode"])
+
+        # Same treatment as freshly rendered sprites; converting also copies out of the mapping
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert() if entry["colorkey"] else sprite.convert_alpha()
+        if entry["colorkey"]:
+            sprite.set_colorkey(entry["colorkey"], pygame.RLEACCEL)
+        self.hits += 1
+        return sprite
+
+    def close(self):
+        self._entries = {}
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # Unconverted sprites still wrap the mapping, it goes away with them
+                pass
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,200 @@
+import pygame
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional, Tuple
+from modules.display.dirty_rects import DirtyRegionManager
+
+# Default stacking, bottom to top
+Z_EYES = 10
+Z_IMAGE = 20
+Z_CARD = 30
+Z_OVERLAY = 40
+
+
+class Layer(ABC):
+    # One plane of the screen. prepare() runs once per frame and returns the
+    # screen areas whose pixels changed; draw() paints the layer and is always
+    # called with the target clipped to a dirty region, so layers never need
+    # to know what else was invalidated.
+
+    def __init__(self, name: str, z: int):
+        self.name = name
+        self.z = z
+        self.visible = True
+        self.opaque = False  # covers the whole screen, nothing below it needs drawing
+        self._invalidated = True
+
+    def invalidate(self):
+        # Forces a full redraw the next time the layer is prepared
+        self._invalidated = True
+
+    @abstractmethod
+    def prepare(self, screen_rect: pygame.Rect) -> List[pygame.Rect]:
+        pass
+
+    @abstractmethod
+    def draw(self, target: pygame.Surface):
+        pass
+
+
+class SurfaceLayer(Layer):
+    # A cached surface shown until replaced: info cards, image frames, badges.
+    # With a backdrop colour the layer fills the screen behind its surface and
+    # hides everything below.
+
+    def __init__(self, name: str, z: int, alpha: int = 255,
+                 backdrop: Optional[Tuple[int, int, int]] = None):
+        super().__init__(name, z)
+        self.alpha = alpha
+        self.backdrop = backdrop
+        self.source: Optional[pygame.Surface] = None  # as handed in, never modified
+        self.surface: Optional[pygame.Surface] = None  # what is drawn, the source with the layer's alpha
+        self.position = (0, 0)
+        self.visible = False
+        self._shown: Optional[pygame.Rect] = None
+        self._pending = False
+
+    def set_surface(self, surface: pygame.Surface, position: Tuple[int, int] = (0, 0)):
+        self.source = surface
+        self.surface = self._faded(surface)
+        self.position = position
+        self.visible = True
+        self.opaque = self.backdrop is not None
+        self._pending = True
+
+    def clear(self):
+        if self.visible:
+            self.source = self.surface = None
+            self.visible = False
+            self.opaque = False
+            self._pending = True
+
+    def set_alpha(self, alpha: int):
+        if alpha != self.alpha:
+            self.alpha = alpha
+            if self.source is not None:
+                self.surface = self._faded(self.source)
+            self._pending = True
+
+    def _faded(self, surface: pygame.Surface) -> pygame.Surface:
+        # Opaque layers draw the caller's surface as is; translucency goes on a
+        # copy the layer owns, set once here rather than on every draw
+        if self.alpha >= 255:
+            return surface
+        faded = surface.copy()
+        faded.set_alpha(self.alpha)
+        return faded
+
+    def _area(self, screen_rect: pygame.Rect) -> Optional[pygame.Rect]:
+        if not self.visible:
+            return None
+        if self.backdrop is not None:
+            return screen_rect.copy()
+        return pygame.Rect(self.position, self.surface.get_size())
+
+    def prepare(self, screen_rect: pygame.Rect) -> List[pygame.Rect]:
+        if not (self._pending or self._invalidated):
+            return []
+        area = self._area(screen_rect)
+        dirty = [rect for rect in (self._shown, area) if rect is not None]
+        self._shown = area
+        self._pending = self._invalidated = False
+        return dirty
+
+    def draw(self, target: pygame.Surface):
+        if self.backdrop is not None:
+            target.fill(self.backdrop)
+        if self.surface is not None:
+            target.blit(self.surface, self.position)
+
+
+class EyesLayer(Layer):
+    # The eyes, redrawn from the controller's sprite layout only when their
+    # visual state changed
+
+    def __init__(self, controller, z: int = Z_EYES):
+        super().__init__(name="eyes", z=z)
+        self.controller = controller
+        self.rects: List[pygame.Rect] = []
+        self._blits: List[Tuple[pygame.Surface, Tuple[int, int]]] = []
+        self._state = None
+
+    def prepare(self, screen_rect: pygame.Rect) -> List[pygame.Rect]:
+        state = self.controller.visual_state()
+        if not self._invalidated and state == self._state:
+            return []
+        # Laid out before drawing so the area under the new position is restored first
+        self._blits = self.controller.layout()
+        rects = [pygame.Rect(position, sprite.get_size()) for sprite, position in self._blits]
+        dirty = self.rects + rects
+        self.rects = rects
+        self._state = state
+        self._invalidated = False
+        return dirty
+
+    def draw(self, target: pygame.Surface):
+        target.blits(self._blits, doreturn=False)
+
+
+class Compositor:
+    # Stacks layers over a background and recomposes only what changed: each
+    # frame the layers report their dirty areas, those are merged into a few
+    # regions, and every region is repainted bottom-up from the topmost opaque
+    # layer before being presented.
+
+    def __init__(self, screen: pygame.Surface, background: pygame.Surface,
+                 dirty: DirtyRegionManager, present: Callable[[List[pygame.Rect]], None]):
+        self.screen = screen
+        self.background = background
+        self.dirty = dirty
+        self.present = present
+        self.layers: List[Layer] = []
+        self._occluded: List[Layer] = []
+
+    def add(self, layer: Layer) -> Layer:
+        self.layers.append(layer)
+        self.layers.sort(key=lambda item: item.z)
+        return layer
+
+    def invalidate(self):
+        for layer in self.layers:
+            layer.invalidate()
+
+    def _visible_stack(self) -> List[Layer]:
+        stack = []
+        for layer in reversed(self.layers):
+            if layer.visible:
+                stack.append(layer)
+                if layer.opaque:
+                    break
+        stack.reverse()
+        return stack
+
+    def compose(self) -> bool:
+        # Returns whether anything was presented
+        screen_rect = self.screen.get_rect()
+        stack = self._visible_stack()
+        drawn = set(map(id, stack))
+
+        for layer in self.layers:
+            if id(layer) in drawn or not layer.visible:
+                # Hidden layers still report the area they used to cover
+                self.dirty.add_all(layer.prepare(screen_rect))
+            else:
+                # Covered by an opaque layer; redraw it whole once it shows again
+                layer.invalidate()
+
+        regions = self.dirty.flush()
+        if not regions:
+            return False
+
+        base = stack[0] if stack and stack[0].opaque else None
+        for region in regions:
+            self.screen.set_clip(region)
+            if base is None:
+                self.screen.blit(self.background, region, region)
+            for layer in stack:
+                layer.draw(self.screen)
+        self.screen.set_clip(None)
+
+        self.present(regions)
+        return True
@@ -0,0 +1,84 @@
+import pygame
+from typing import Iterable, List, Optional
+
+DEFAULT_RECT_COST = 1024  # px, fixed cost of one more update region (window setup on SPI panels)
+DEFAULT_MAX_RECTS = 4
+DEFAULT_FULL_FLIP_RATIO = 0.6
+
+
+class DirtyRegionManager:
+    # Collects the rects touched in a frame and reduces them to the cheapest
+    # set to push: clipped to the screen, overlapping or nearby rects merged,
+    # and a single full-screen region once that transfers about as much.
+    # Cost is counted in pixels plus `rect_cost` per region.
+
+    def __init__(self, bounds: pygame.Rect, rect_cost: int = DEFAULT_RECT_COST,
+                 max_rects: int = DEFAULT_MAX_RECTS, full_flip_ratio: float = DEFAULT_FULL_FLIP_RATIO):
+        self.bounds = pygame.Rect(bounds)
+        self.rect_cost = rect_cost
+        self.max_rects = max(max_rects, 1)
+        self.full_flip_ratio = full_flip_ratio
+        self._rects: List[pygame.Rect] = []
+
+        self.frames = 0
+        self.full_flips = 0
+        self.pixels_requested = 0
+        self.pixels_pushed = 0
+
+    def add(self, rect: Optional[pygame.Rect]):
+        if rect is None:
+            return
+        clipped = self.bounds.clip(rect)
+        if clipped.width > 0 and clipped.height > 0:
+            self._rects.append(clipped)
+
+    def add_all(self, rects: Iterable[Optional[pygame.Rect]]):
+        for rect in rects:
+            self.add(rect)
+
+    def _merge_cost(self, a: pygame.Rect, b: pygame.Rect) -> int:
+        # Extra pixels pushed by sending the union instead of both rects
+        union = a.union(b)
+        return union.width * union.height - (a.width * a.height + b.width * b.height) - self.rect_cost
+
+    def regions(self) -> List[pygame.Rect]:
+        # Pending rects reduced to what should be pushed, without clearing them
+        rects = [rect.copy() for rect in self._rects]
+        merged = True
+        while merged and len(rects) > 1:
+            merged = False
+            for i in range(len(rects)):
+                for j in range(i + 1, len(rects)):
+                    # Covers duplicates and contained rects too, their union costs nothing extra
+                    if self._merge_cost(rects[i], rects[j]) <= 0:
+                        rects[i].union_ip(rects.pop(j))
+                        merged = True
+                        break
+                if merged:
+                    break
+
+        while len(rects) > self.max_rects:
+            _, i, j = min((self._merge_cost(rects[i], rects[j]), i, j)
+                       for i in range(len(rects)) for j in range(i + 1, len(rects)))
+            rects[i].union_ip(rects.pop(j))
+
+        area = sum(rect.width * rect.height for rect in rects) + self.rect_cost * len(rects)
+        if rects and area >= self.bounds.width * self.bounds.height * self.full_flip_ratio:
+            return [self.bounds.copy()]
+        return rects
+
+    def flush(self) -> List[pygame.Rect]:
+        # Returns the regions for this frame and starts the next one
+        requested = sum(rect.width * rect.height for rect in self._rects)
+        rects = self.regions()
+        self._rects = []
+        if rects:
+            self.frames += 1
+            self.pixels_requested += requested
+            self.pixels_pushed += sum(rect.width * rect.height for rect in rects)
+            if rects[0] == self.bounds:
+                self.full_flips += 1
+        return rects
+
+    def clear(self):
+        self._rects = []
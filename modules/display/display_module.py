@@ -2,69 +2,158 @@ import pygame
 import logging
 import os
 import time
+from typing import Optional
 from modules.base_module import BaseModule
+from modules.display.atlas import SpriteAtlas, config_fingerprint
+from modules.display.compositor import Compositor, EyesLayer, SurfaceLayer, Z_CARD, Z_IMAGE, Z_OVERLAY
+from modules.display.dirty_rects import DirtyRegionManager
 from modules.display.eyes_controller import RoboEyesController
+from modules.display.framebuffer import FramebufferOutput
+from modules.display.image_player import ImagePlayer
 from modules.display.renderers.valorant_info_renderer import ValorantInfoRenderer
 from core.event_manager import EventType, Event
+from core.watchdog import REDUCE_EFFECTS, REDUCE_FPS
+from utils.clock import now
+from utils.metrics import Histogram
 
 logger = logging.getLogger(__name__)
 
 
 class DisplayModule(BaseModule):
     
+    REQUIRES_MAIN_THREAD = True
+    CRITICAL = True
+    
     def __init__(self, config):
         super().__init__(config)
         self.screen = None
         self.clock = None
         self.eyes_controller = None
         self.background = None
-        self.previous_rects = []
+        self.dirty = None
+        self.framebuffer = None
+        self.atlas = None
+        self.compositor = None
         self.running = False
+        self.target_fps = config.FPS
+        self.shadow_layers = config.SHADOW_LAYERS  # effective count, the config keeps the base one
+        self.frame_time = Histogram()
         
         self.project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         self.assets_img_dir = os.path.join(self.project_root, "assets", "img")
-        self.current_image = None
+        self.image_player = None
         self.display_image = False
         self.image_start_time = 0
         self.image_display_duration = 0
+        self.overlay_start_time = 0
+        self.overlay_duration = 0
 
         self.display_valorant_info = False
 
         self.current_renderer_key = None
         self.current_renderer_data = None
+        self.frames_skipped = 0
+        self.idle = False
 
     def get_name(self) -> str:
         return "display"
     
+    def get_update_interval(self) -> float:
+        return 1.0 / self.target_fps
+    
+    def get_next_update_time(self, current: float) -> Optional[float]:
+        # Full rate while anything moves. Once the screen is static, tick at
+        # IDLE_FPS but wake in time for the next automatic action or timeout;
+        # events snap back to full rate through request_update().
+        idle_fps = self.config.IDLE_FPS
+        if not self.idle or not idle_fps or idle_fps >= self.target_fps:
+            return None
+        wait = 1.0 / idle_fps
+        time_now = now()
+        if self.overlay_duration > 0 and self.overlay_layer.visible:
+            wait = min(wait, self.overlay_start_time + self.overlay_duration - time_now)
+        if self.current_renderer_key:
+            if self.display_duration > 0:
+                wait = min(wait, self.display_active_start_time + self.display_duration - time_now)
+        elif self.display_image:
+            if self.image_display_duration > 0:
+                wait = min(wait, self.image_start_time + self.image_display_duration - time_now)
+        else:
+            wait = min(wait, self.eyes_controller.next_animation_time - time_now)
+        return current + max(wait, 0.0)
+    
+    def apply_degradation(self, policies):
+        if REDUCE_EFFECTS in policies:
+            self.shadow_layers = self.config.SHADOW_LAYERS // 2
+        else:
+            self.shadow_layers = self.config.SHADOW_LAYERS
+        if self.eyes_controller is not None:
+            self.eyes_controller.set_shadow_layers(self.shadow_layers)
+        
+        if REDUCE_FPS in policies:
+            self.target_fps = min(self.config.DEGRADED_FPS, self.config.FPS)
+        else:
+            self.target_fps = self.config.FPS
+        logger.info(f"Display running at {self.target_fps} FPS with {self.shadow_layers} shadow layers")
+    
     def initialize(self):
         logger.info("Initializing display module")
         
         pygame.init()
         
-        flags = pygame.FULLSCREEN if self.config.FULLSCREEN else 0
-        self.screen = pygame.display.set_mode(
-            (self.config.SCREEN_WIDTH, self.config.SCREEN_HEIGHT),
-            flags
-        )
+        size = (self.config.SCREEN_WIDTH, self.config.SCREEN_HEIGHT)
+        if self.config.OUTPUT_BACKEND == "framebuffer":
+            # SDL only provides the off-screen surface, presenting goes to the framebuffer
+            self.screen = pygame.display.set_mode(size)
+            self.framebuffer = FramebufferOutput(self.config.FRAMEBUFFER_DEVICE, size,
+                                                 self.config.FRAMEBUFFER_FORMAT)
+            self.framebuffer.open()
+        else:
+            flags = pygame.FULLSCREEN if self.config.FULLSCREEN else 0
+            self.screen = pygame.display.set_mode(size, flags)
         pygame.mouse.set_visible(False)
         pygame.display.set_caption("Ada")
         
         self.clock = pygame.time.Clock()
         
         self.renderers = {
-            'valorant_info': ValorantInfoRenderer(self.screen, self.project_root)
+            'valorant_info': ValorantInfoRenderer(self.screen, self.project_root,
+                                                  self.config.BACKGROUND_COLOR)
         }
 
         self.background = pygame.Surface(
             (self.config.SCREEN_WIDTH, self.config.SCREEN_HEIGHT)
         )
         self.background.fill(self.config.BACKGROUND_COLOR)
+        if self.framebuffer:
+            # Whatever the console left on the panel is not covered by dirty regions
+            self.screen.blit(self.background, (0, 0))
+            self._present([self.screen.get_rect()])
+        self.dirty = DirtyRegionManager(
+            self.screen.get_rect(),
+            rect_cost=self.config.DIRTY_RECT_COST,
+            max_rects=self.config.DIRTY_MAX_RECTS,
+            full_flip_ratio=self.config.DIRTY_FULL_FLIP_RATIO
+        )
+        
+        if self.config.ATLAS_PATH:
+            self.atlas = SpriteAtlas.load(os.path.join(self.project_root, self.config.ATLAS_PATH),
+                                          config_fingerprint(self.config))
         
         self.eyes_controller = RoboEyesController(
             self.config.SCREEN_WIDTH,
             self.config.SCREEN_HEIGHT,
-            self.config
+            self.config,
+            self.atlas
         )
+        self.eyes_controller.set_shadow_layers(self.shadow_layers)
+        
+        # Eyes at the bottom; images and cards fill the screen over them; overlays on top
+        self.compositor = Compositor(self.screen, self.background, self.dirty, self._present)
+        self.compositor.add(EyesLayer(self.eyes_controller))
+        self.image_layer = self.compositor.add(SurfaceLayer("image", Z_IMAGE, backdrop=self.config.BACKGROUND_COLOR))
+        self.card_layer = self.compositor.add(SurfaceLayer("card", Z_CARD, backdrop=self.config.BACKGROUND_COLOR))
+        self.overlay_layer = self.compositor.add(SurfaceLayer("overlay", Z_OVERLAY))
         
         self._subscribe_to_events()
         
@@ -79,6 +168,7 @@ class DisplayModule(BaseModule):
             self.event_manager.subscribe(EventType.DISPLAY_LOOK, self._on_look_event)
             self.event_manager.subscribe(EventType.FACE_DETECTED, self._on_face_detected)
             self.event_manager.subscribe(EventType.DISPLAY_IMAGE, self._on_display_image)
+            self.event_manager.subscribe(EventType.DISPLAY_OVERLAY, self._on_display_overlay)
             self.event_manager.subscribe(EventType.DISPLAY_VALORANT_INFO, self._on_display_valorant_info)
     
     def _on_emotion_event(self, event: Event):
@@ -91,6 +181,7 @@ class DisplayModule(BaseModule):
             self.eyes_controller.trigger_heart_eyes()
         elif emotion == 'surprise':
             self.eyes_controller.trigger_shake()
+        self.request_update()
     
     def _on_animation_event(self, event: Event):
         animation = event.data.get('animation')
@@ -106,42 +197,101 @@ class DisplayModule(BaseModule):
             self.eyes_controller.trigger_heart_eyes()
         elif animation == 'blink':
             self.eyes_controller.trigger_blink()
+        elif animation and not self.eyes_controller.play_expression(animation):
+            logger.debug(f"Expression {animation} is unknown or the eyes are busy")
+        self.request_update()
     
     def _on_look_event(self, event: Event):
         direction = event.data.get('direction', 'center')
         logger.debug(f"Look event: {direction}")
         self.eyes_controller.set_look_direction(direction)
+        self.request_update()
     
     def _on_face_detected(self, event: Event):
         face_position = event.data.get('position')
         if face_position:
             logger.debug(f"Face detected at {face_position}")
             self.eyes_controller.set_look_direction("center")
+            self.request_update()
 
     def _on_display_image(self, event):
+        # image_path may be a still image, an animated GIF, a directory of
+        # numbered frames or a printf-style pattern like "anim/wave_%03d.png"
         relative_path = event.data.get('image_path')
         duration = event.data.get('duration', 0) 
         if relative_path:
             full_path = os.path.join(self.project_root, relative_path)
-            if os.path.exists(full_path):
-                try:
-                    self.current_image = pygame.image.load(full_path)
-                    self.display_image = True
-                    self.image_start_time = time.time()
-                    self.image_display_duration = duration
-                except Exception as e:
-                    print(f"Failed to load image {full_path}: {e}")
+            if os.path.exists(full_path) or '%' in full_path:
+                self._stop_image()
+                self.image_player = ImagePlayer(
+                    full_path,
+                    self.screen.get_size(),
+                    loop=event.data.get('loop', True),
+                    fps=event.data.get('fps'),
+                    prefetch=self.config.IMAGE_PREFETCH
+                )
+                self.image_player.start()
+                self.display_image = True
+                self.image_start_time = now()
+                self.image_display_duration = duration
+                self.request_update()
             else:
                 print(f"Image file not found: {full_path}")
 
+    def _on_display_overlay(self, event):
+        # A still image drawn over whatever is showing, e.g. a badge over the
+        # eyes; an event without image_path takes the overlay down
+        relative_path = event.data.get('image_path')
+        if not relative_path:
+            self.clear_overlay()
+            return
+        full_path = os.path.join(self.project_root, relative_path)
+        try:
+            surface = pygame.image.load(full_path).convert_alpha()
+        except (pygame.error, FileNotFoundError) as e:
+            logger.warning(f"Cannot load overlay {full_path}: {e}")
+            return
+        self.set_overlay(surface, tuple(event.data.get('position', (0, 0))),
+                         event.data.get('alpha', 255), event.data.get('duration', 0))
+
+    def _stop_image(self):
+        if self.image_player:
+            self.image_player.close()
+            self.image_player = None
+        self.display_image = False
+
     def _on_display_valorant_info(self, event):
         self.current_renderer_key = 'valorant_info'
         self.current_renderer_data = event.data
-        self.display_active_start_time = time.time()
+        self.display_active_start_time = now()
         self.display_duration = event.data.get('duration', 0)
         self.display_valorant_info = True
+        self.request_update()
+    
+    def get_metrics(self):
+        metrics = {
+            "frame_seconds": self.frame_time,
+            "fps": self.clock.get_fps() if self.clock else 0.0,
+            "target_fps": self.target_fps,
+            "idle": int(self.idle),
+            "frames_skipped_total": self.frames_skipped,
+        }
+        if self.eyes_controller:
+            cache = self.eyes_controller.sprite_cache
+            metrics.update(sprite_cache_bytes=cache.bytes, sprite_cache_hits_total=cache.hits,
+                           sprite_cache_misses_total=cache.misses)
+        if self.atlas is not None:
+            metrics.update(atlas_hits_total=self.atlas.hits)
+        if self.framebuffer:
+            metrics.update(framebuffer_bytes_written_total=self.framebuffer.bytes_written)
+        if self.dirty:
+            metrics.update(dirty_pixels_requested_total=self.dirty.pixels_requested,
+                           dirty_pixels_pushed_total=self.dirty.pixels_pushed,
+                           dirty_full_flips_total=self.dirty.full_flips)
+        return metrics
     
     def update(self):
+        started = time.perf_counter()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
@@ -152,13 +302,18 @@ class DisplayModule(BaseModule):
                 self._handle_keydown(event.key)
 
         if self.display_image and self.image_display_duration > 0:
-            elapsed = time.time() - self.image_start_time
+            elapsed = now() - self.image_start_time
             if elapsed >= self.image_display_duration:
-                self.display_image = False
-                self.current_image = None
+                self._stop_image()
+        if self.image_player and self.image_player.failed:
+            self._stop_image()
+
+        if self.overlay_duration > 0 and self.overlay_layer.visible:
+            if now() - self.overlay_start_time >= self.overlay_duration:
+                self.clear_overlay()
 
         if self.current_renderer_key == 'valorant_info' and self.display_duration > 0:
-            elapsed = time.time() - self.display_active_start_time
+            elapsed = now() - self.display_active_start_time
             if elapsed >= self.display_duration:
                 self.current_renderer_key = None
                 self.current_renderer_data = None
@@ -166,9 +321,12 @@ class DisplayModule(BaseModule):
         
         self.eyes_controller.update()
         
-        self._render()
+        presented = self._render()
+        self.idle = not presented and self._is_settled()
+        self.frame_time.observe(time.perf_counter() - started)
         
-        self.clock.tick(self.config.FPS)
+        # Pacing is done by the controller's scheduler, the clock only measures
+        self.clock.tick()
     
     def _handle_keydown(self, key: int):
         key_actions = {
@@ -183,54 +341,67 @@ class DisplayModule(BaseModule):
         if action:
             action()
     
-    def _render(self):
-        current_rects = []
+    def _is_settled(self) -> bool:
         if self.current_renderer_key:
-            renderer = self.renderers.get(self.current_renderer_key)
-            if renderer and self.current_renderer_data:
-                self.screen.blit(self.background, (0, 0))
-                renderer.render(self.current_renderer_data)
-            full_screen_rect = self.screen.get_rect()
-            pygame.display.update(full_screen_rect)
-            current_rects = [full_screen_rect]
-        elif self.display_image and self.current_image:
-            self.screen.blit(self.background, (0, 0))
-            
-            screen_width, screen_height = self.screen.get_size()
-            img_width, img_height = self.current_image.get_size()
-            
-            scale_w = screen_width / img_width
-            scale_h = screen_height / img_height
-            scale = min(scale_w, scale_h)
-
-            new_width = int(img_width * scale)
-            new_height = int(img_height * scale)
-            
-            scaled_image = pygame.transform.scale(self.current_image, (new_width, new_height))
-            
-            pos_x = (screen_width - new_width) // 2
-            pos_y = (screen_height - new_height) // 2
-            
-            self.screen.blit(scaled_image, (pos_x, pos_y))
-            
-            full_screen_rect = self.screen.get_rect()
-            pygame.display.update(full_screen_rect)
-            current_rects = [full_screen_rect]
+            return True
+        if self.display_image and self.image_player:
+            return self.image_player.is_static
+        return self.eyes_controller.is_idle()
+    
+    def _present(self, rects):
+        if self.framebuffer:
+            self.framebuffer.write(self.screen, rects)
         else:
-            for rect in self.previous_rects:
-                self.screen.blit(self.background, rect, rect)
-
-            current_rects = self.eyes_controller.get_bounding_rects()
-            self.eyes_controller.draw(self.screen)
-
-            pygame.display.update(self.previous_rects + current_rects)
+            pygame.display.update(rects)
+    
+    def set_overlay(self, surface: pygame.Surface, position=(0, 0), alpha: int = 255, duration: float = 0):
+        # Shows a surface above everything else until cleared, or for `duration` seconds
+        self.overlay_layer.set_alpha(alpha)
+        self.overlay_layer.set_surface(surface, position)
+        self.overlay_start_time = now()
+        self.overlay_duration = duration
+        self.request_update()
+    
+    def clear_overlay(self):
+        self.overlay_layer.clear()
+        self.request_update()
+    
+    def _sync_layers(self):
+        renderer = self.renderers.get(self.current_renderer_key) if self.current_renderer_key else None
+        if renderer and self.current_renderer_data:
+            # The card is cached by the renderer, the layer only changes when it was rebuilt
+            card, changed = renderer.compose(self.current_renderer_data)
+            if changed or not self.card_layer.visible:
+                self.card_layer.set_surface(card)
+        else:
+            self.card_layer.clear()
         
-        self.previous_rects = current_rects
-
+        if self.display_image and self.image_player:
+            # Frames arrive decoded and scaled to the screen, a new one is one blit
+            frame, changed = self.image_player.frame(now())
+            if frame is not None and (changed or not self.image_layer.visible):
+                self.image_layer.set_surface(frame, self.image_player.position)
+        else:
+            self.image_layer.clear()
+    
+    def _render(self) -> bool:
+        # Returns whether anything was pushed to the screen
+        self._sync_layers()
+        presented = self.compositor.compose()
+        if not presented:
+            self.frames_skipped += 1
+        return presented
 
     def shutdown(self):
         logger.info("Shutting down display module")
         self.running = False
+        self._stop_image()
+        if self.framebuffer:
+            self.framebuffer.close()
+            self.framebuffer = None
+        if self.atlas is not None:
+            self.atlas.close()
+            self.atlas = None
         if pygame.get_init():
             pygame.quit()
         logger.info("Display module shut down")
@@ -1,31 +1,36 @@
-import time
 import random
-import math
+from typing import Optional
 from modules.display.robo_eye import RoboEye
-from modules.display.animations import AnimationType, AnimationState
-from utils.helpers import ease_in_out
+from modules.display.animations import AnimationType, AnimationState, BoundTimeline, load_timelines
+from modules.display.sprite_cache import SpriteCache
+from utils.clock import now
 
 
 class RoboEyesController:
     
     SHAKE_DURATION = 0.8
-    SHAKE_CYCLES = 2
-    SHAKE_AMPLITUDE = 50
-    
     NOD_DURATION = 0.5
-    NOD_CYCLES = 2
-    NOD_AMPLITUDE = 35
+    EXPRESSION_DURATION = 1.0  # for declared expressions that do not give one
+    OFFSET_PROPERTIES = ("offset_x", "offset_y")
+    OFFSET_VARIABLES = ("max_offset_x", "max_offset_y")
     
     LOOK_DIRECTIONS = [
         "center", "left", "right", "up", "down",
         "up-left", "down-right", "up-right"
     ]
     
-    def __init__(self, screen_width: int, screen_height: int, config):
+    def __init__(self, screen_width: int, screen_height: int, config, atlas=None):
         self.config = config
         self.screen_width = screen_width
         self.screen_height = screen_height
         
+        # One cache for both eyes, they always share their geometry
+        self.sprite_cache = SpriteCache(config.SPRITE_CACHE_BYTES, config.SPRITE_QUANTUM, atlas)
+        # Built-in animations plus any expressions declared in the config
+        self.timelines = load_timelines(getattr(config, 'EXPRESSIONS', None),
+                                        properties=(*RoboEye.TIMELINE_ATTRIBUTES, *self.OFFSET_PROPERTIES),
+                                        variables=(*RoboEye.TIMELINE_VARIABLES, *self.OFFSET_VARIABLES))
+        
         center_y = screen_height / 2
         center_left_x = screen_width / 2 - config.EYE_WIDTH - config.EYE_GAP / 2
         center_right_x = screen_width / 2 + config.EYE_GAP / 2
@@ -35,26 +40,39 @@ class RoboEyesController:
             center_y,
             config.EYE_WIDTH,
             config.EYE_HEIGHT,
-            config
+            config,
+            self.sprite_cache,
+            self.timelines
         )
         self.right_eye = RoboEye(
             center_right_x + config.EYE_WIDTH / 2,
             center_y,
             config.EYE_WIDTH,
             config.EYE_HEIGHT,
-            config
+            config,
+            self.sprite_cache,
+            self.timelines
         )
         
         self.shake_state = AnimationState()
         self.nod_state = AnimationState()
+        self.expression_state = AnimationState()
+        
+        variables = self.left_eye.timeline_variables()
+        variables.update(zip(self.OFFSET_VARIABLES, (config.MAX_OFFSET_X, config.MAX_OFFSET_Y)))
+        self.timeline_variables = variables
+        self.shake_timeline = self.timelines["shake"].bind(variables)
+        self.nod_timeline = self.timelines["nod"].bind(variables)
+        self.expression: Optional[BoundTimeline] = None
         
         self.animation_queue = config.ANIMATION_CYCLE.copy()
         self.current_animation_index = 0
-        self.next_animation_time = time.time() + random.uniform(*config.ANIMATION_INTERVAL)
+        self.next_animation_time = now() + random.uniform(*config.ANIMATION_INTERVAL)
     
     def is_special_animation_active(self) -> bool:
         return (self.shake_state.is_active or
                 self.nod_state.is_active or
+                self.expression_state.is_active or
                 self.left_eye.animations[AnimationType.SMILE].is_active or
                 self.left_eye.animations[AnimationType.HEART].is_active)
     
@@ -76,10 +94,23 @@ class RoboEyesController:
             self.left_eye.start_animation(AnimationType.HEART)
             self.right_eye.start_animation(AnimationType.HEART)
     
+    def play_expression(self, name: str) -> bool:
+        # Plays a declared timeline on both eyes; returns False if unknown or busy
+        timeline = self.timelines.get(name)
+        if timeline is None or self.is_special_animation_active():
+            return False
+        self.expression = timeline.bind(self.timeline_variables)
+        self.expression_state.start(self.expression.duration or self.EXPRESSION_DURATION)
+        return True
+    
     def trigger_blink(self):
         self.left_eye.start_animation(AnimationType.BLINK)
         self.right_eye.start_animation(AnimationType.BLINK)
     
+    def set_shadow_layers(self, layers: int):
+        self.left_eye.shadow_layers = layers
+        self.right_eye.shadow_layers = layers
+    
     def set_look_direction(self, direction: str):
         target_left_x = self.left_eye.center_x - self.left_eye.width / 2
         target_left_y = self.left_eye.center_y - self.left_eye.height / 2
@@ -106,51 +137,54 @@ class RoboEyesController:
         self.right_eye.set_look_target(target_right_x, target_right_y)
     
     def update(self, enable_auto_animations: bool = True):
-        current_time = time.time()
+        # One clock sample drives every track this frame
+        current_time = now()
         
         if self.shake_state.is_active:
-            self._update_shake()
+            self._update_offsets(self.shake_state, self.shake_timeline, current_time)
         elif self.nod_state.is_active:
-            self._update_nod()
+            self._update_offsets(self.nod_state, self.nod_timeline, current_time)
+        
+        expression_values = None
+        if self.expression_state.is_active:
+            expression_values = self._update_offsets(self.expression_state, self.expression, current_time)
         
         if enable_auto_animations and not self.is_special_animation_active():
             self._update_automatic_actions(current_time)
         
-        self.left_eye.update()
-        self.right_eye.update()
-    
-    def _update_shake(self):
-        progress = self.shake_state.get_progress()
+        self.left_eye.update(current_time)
+        self.right_eye.update(current_time)
         
-        if not self.shake_state.is_finished():
-            eased_progress = ease_in_out(ease_in_out(progress))
-            offset = math.sin(eased_progress * self.SHAKE_CYCLES * 2 * math.pi) * self.SHAKE_AMPLITUDE
-            offset *= (1.0 - progress * 0.7)
-            
-            self.set_look_direction("center")
-            self.left_eye.target_x += offset
-            self.right_eye.target_x += offset
-        else:
-            self.shake_state.stop()
-            self.set_look_direction("center")
-    
-    def _update_nod(self):
-        progress = self.nod_state.get_progress()
+        if expression_values:
+            # Shape tracks go over whatever the eyes computed for this frame
+            self.left_eye.apply_timeline_values(expression_values)
+            self.right_eye.apply_timeline_values(expression_values)
+    
+    def _update_offsets(self, state: AnimationState, timeline: BoundTimeline, current_time: float):
+        # Moves both look targets by the timeline's offsets; returns the sampled values while running.
+        # Only timelines with offset tracks take over the gaze, shape-only ones leave it alone.
+        values = timeline.sample(state.get_progress(current_time))
+        moves_gaze = any(name in timeline.properties for name in self.OFFSET_PROPERTIES)
         
-        if not self.nod_state.is_finished():
-            eased_progress = ease_in_out(progress)
-            offset = math.sin(eased_progress * self.NOD_CYCLES * 2 * math.pi) * self.NOD_AMPLITUDE
-            offset *= (1.0 - progress * 0.3)
-            
+        if not state.is_finished(current_time):
+            if not moves_gaze:
+                return values
             self.set_look_direction("center")
-            self.left_eye.target_y += offset
-            self.right_eye.target_y += offset
-        else:
-            self.nod_state.stop()
+            offset_x = values.get("offset_x", 0.0)
+            offset_y = values.get("offset_y", 0.0)
+            self.left_eye.target_x += offset_x
+            self.right_eye.target_x += offset_x
+            self.left_eye.target_y += offset_y
+            self.right_eye.target_y += offset_y
+            return values
+        
+        state.stop()
+        if moves_gaze:
             self.set_look_direction("center")
+        return None
     
     def _update_automatic_actions(self, current_time: float):
-        if current_time > self.next_animation_time:
+        if current_time >= self.next_animation_time:
             animation_type = self.animation_queue[self.current_animation_index]
             
             if animation_type == "blink":
@@ -168,9 +202,20 @@ class RoboEyesController:
             self.current_animation_index = (self.current_animation_index + 1) % len(self.animation_queue)
             self.next_animation_time = current_time + random.uniform(*self.config.ANIMATION_INTERVAL)
     
+    def is_idle(self) -> bool:
+        # No animation running and both eyes have reached their look target
+        return (not self.shake_state.is_active and not self.nod_state.is_active and
+                not self.expression_state.is_active and
+                self.left_eye.is_settled() and self.right_eye.is_settled())
+    
+    def visual_state(self) -> tuple:
+        return self.left_eye.visual_state(), self.right_eye.visual_state()
+    
+    def layout(self):
+        return self.left_eye.layout() + self.right_eye.layout()
+    
     def draw(self, surface):
-        self.left_eye.draw(surface)
-        self.right_eye.draw(surface)
+        return [self.left_eye.draw(surface), self.right_eye.draw(surface)]
     
     def get_bounding_rects(self):
         return [
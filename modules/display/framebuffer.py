@@ -0,0 +1,160 @@
+import fcntl
+import logging
+import mmap
+import os
+import stat
+import struct
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple
+
+import pygame
+
+logger = logging.getLogger(__name__)
+
+FBIOGET_VSCREENINFO = 0x4600
+# xres, yres, xres_virtual, yres_virtual, xoffset, yoffset, bits_per_pixel,
+# grayscale, then offset/length/msb_right for red, green, blue and transp
+_VSCREENINFO = struct.Struct("8I12I")
+_VSCREENINFO_SIZE = 160  # the kernel struct carries timing fields after the colour layout
+
+
+@dataclass(frozen=True)
+class PixelFormat:
+    bits_per_pixel: int
+    red: Tuple[int, int]  # (offset, length) of each channel in the pixel word
+    green: Tuple[int, int]
+    blue: Tuple[int, int]
+
+    @property
+    def bytes_per_pixel(self) -> int:
+        return self.bits_per_pixel // 8
+
+
+RGB565 = PixelFormat(16, (11, 5), (5, 6), (0, 5))
+XRGB8888 = PixelFormat(32, (16, 8), (8, 8), (0, 8))
+FORMATS = {"RGB565": RGB565, "XRGB8888": XRGB8888}
+
+
+def _read_sysfs(device: str, name: str) -> Optional[str]:
+    path = os.path.join("/sys/class/graphics", os.path.basename(device), name)
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+class FramebufferOutput:
+    # Writes dirty regions of a pygame surface straight into a memory-mapped
+    # Linux framebuffer (/dev/fbN), converting to the panel's pixel format on
+    # the way. The surface is read in place through surfarray and the device
+    # through a numpy view of the mapping, so the only copy is the converted
+    # region itself. A regular file works as the device, sized from `size`
+    # and `pixel_format`, which is how the backend is exercised off-target.
+
+    def __init__(self, device: str, size: Tuple[int, int], pixel_format: Optional[str] = None):
+        self.device = device
+        self.size = size
+        self.requested_format = pixel_format
+        self.pixel_format: Optional[PixelFormat] = None
+        self.stride = 0
+        self.bytes_written = 0
+        self.frames = 0
+
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._pixels = None  # numpy view of the visible area, indexed [y, x]
+
+    def open(self):
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError("numpy is required for the framebuffer output backend")
+
+        exists = os.path.exists(self.device)
+        is_device = exists and stat.S_ISCHR(os.stat(self.device).st_mode)
+        self._file = open(self.device, "r+b" if exists else "w+b")
+        try:
+            if is_device:
+                width, height, pixel_format, stride = self._probe_device()
+            else:
+                width, height = self.size
+                pixel_format = FORMATS[self.requested_format or "RGB565"]
+                stride = width * pixel_format.bytes_per_pixel
+                if os.fstat(self._file.fileno()).st_size < stride * height:
+                    self._file.truncate(stride * height)
+
+            if self.requested_format and FORMATS[self.requested_format] != pixel_format:
+                logger.warning(f"{self.device} is {pixel_format.bits_per_pixel} bpp, "
+                               f"ignoring configured format {self.requested_format}")
+            if pixel_format.bits_per_pixel not in (16, 32):
+                raise RuntimeError(f"Unsupported framebuffer depth: {pixel_format.bits_per_pixel} bpp")
+
+            self.pixel_format = pixel_format
+            self.stride = stride
+            self._map = mmap.mmap(self._file.fileno(), stride * height)
+            dtype = numpy.uint16 if pixel_format.bits_per_pixel == 16 else numpy.uint32
+            rows = numpy.frombuffer(self._map, dtype=dtype).reshape(height, stride // pixel_format.bytes_per_pixel)
+            self._pixels = rows[:, :width]
+        except Exception:
+            self.close()
+            raise
+
+        if (width, height) != tuple(self.size):
+            logger.warning(f"{self.device} is {width}x{height}, drawing {self.size[0]}x{self.size[1]} at the top left")
+        logger.info(f"Framebuffer {self.device}: {width}x{height}, {pixel_format.bits_per_pixel} bpp, stride {stride}")
+
+    def _probe_device(self) -> Tuple[int, int, PixelFormat, int]:
+        info = bytearray(_VSCREENINFO_SIZE)
+        fcntl.ioctl(self._file.fileno(), FBIOGET_VSCREENINFO, info)
+        fields = _VSCREENINFO.unpack_from(info)
+        width, height, bits_per_pixel = fields[0], fields[1], fields[6]
+        red, green, blue = fields[8:10], fields[11:13], fields[14:16]
+        pixel_format = PixelFormat(bits_per_pixel, tuple(red), tuple(green), tuple(blue))
+
+        stride = _read_sysfs(self.device, "stride")
+        stride = int(stride) if stride else width * bits_per_pixel // 8
+        return width, height, pixel_format, stride
+
+    def _channel_ops(self, surface: pygame.Surface) -> Tuple[Tuple[int, int], ...]:
+        # (right shift, mask) per channel from the surface's 8-bit layout to the panel's
+        fmt = self.pixel_format
+        ops = []
+        for source_shift, (offset, length) in zip(surface.get_shifts()[:3], (fmt.red, fmt.green, fmt.blue)):
+            ops.append((source_shift + 8 - length - offset, ((1 << length) - 1) << offset))
+        return tuple(ops)
+
+    def write(self, surface: pygame.Surface, rects: Iterable[pygame.Rect]):
+        if self._pixels is None:
+            return
+        bounds = pygame.Rect((0, 0), self._pixels.shape[::-1]).clip(surface.get_rect())
+        # Surface pixels as mapped 32-bit words, indexed [x, y], without copying
+        source = pygame.surfarray.pixels2d(surface)
+        channels = self._channel_ops(surface)
+        dtype = self._pixels.dtype
+        try:
+            for rect in rects:
+                rect = bounds.clip(rect)
+                if rect.width <= 0 or rect.height <= 0:
+                    continue
+                region = source[rect.left:rect.right, rect.top:rect.bottom].T
+                pixel = None
+                for shift, mask in channels:
+                    # One shift and one mask moves a channel's top bits into place
+                    bits = (region >> shift if shift >= 0 else region << -shift) & mask
+                    pixel = bits if pixel is None else pixel | bits
+                self._pixels[rect.top:rect.bottom, rect.left:rect.right] = pixel.astype(dtype, copy=False)
+                self.bytes_written += rect.width * rect.height * self.pixel_format.bytes_per_pixel
+        finally:
+            # pixels2d locks the surface until the view is released
+            del source
+        self.frames += 1
+
+    def close(self):
+        self._pixels = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,261 @@
+import pygame
+import logging
+import os
+import queue
+import re
+import threading
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FRAME_DURATION = 0.1  # seconds, GIF frames without timing and sequences without fps
+DEFAULT_PREFETCH = 8
+PUT_TIMEOUT = 0.1
+JOIN_TIMEOUT = 1.0  # seconds to wait for the decoder, a hung decode must not hang shutdown
+
+_END = object()
+_NUMBER = re.compile(r"(\d+)")
+_pillow_warned = False
+
+
+def _natural_key(name: str):
+    return [int(part) if part.isdigit() else part for part in _NUMBER.split(name)]
+
+
+def sequence_paths(path: str) -> List[str]:
+    # A directory of numbered frames (frame_1.png ... frame_120.png) or a
+    # printf-style pattern such as "wave/frame_%03d.png"
+    if os.path.isdir(path):
+        names = [name for name in os.listdir(path) if name.lower().endswith((".png", ".jpg", ".bmp"))]
+        return [os.path.join(path, name) for name in sorted(names, key=_natural_key)]
+    if "%" in path:
+        paths = []
+        for start in (0, 1):
+            index = start
+            while os.path.exists(path % index):
+                paths.append(path % index)
+                index += 1
+            if paths:
+                break
+        return paths
+    return []
+
+
+def _skip_sub_blocks(f):
+    while True:
+        size = f.read(1)
+        if not size or size[0] == 0:
+            return
+        f.seek(size[0], os.SEEK_CUR)
+
+
+def gif_frame_count(path: str, limit: int = 2) -> int:
+    # Counts image blocks without decoding them, stopping at `limit`; enough
+    # to tell an animation from a still without Pillow
+    count = 0
+    with open(path, "rb") as f:
+        header = f.read(13)
+        if len(header) < 13 or not header.startswith(b"GIF"):
+            return 0
+        if header[10] & 0x80:
+            f.seek(3 << ((header[10] & 0x07) + 1), os.SEEK_CUR)  # global colour table
+        while count < limit:
+            block = f.read(1)
+            if block == b"\x2c":  # image descriptor
+                descriptor = f.read(9)
+                if len(descriptor) < 9:
+                    break
+                if descriptor[8] & 0x80:
+                    f.seek(3 << ((descriptor[8] & 0x07) + 1), os.SEEK_CUR)  # local colour table
+                f.seek(1, os.SEEK_CUR)  # LZW minimum code size
+                _skip_sub_blocks(f)
+                count += 1
+            elif block == b"\x21":  # extension
+                f.seek(1, os.SEEK_CUR)
+                _skip_sub_blocks(f)
+            else:
+                break
+    return count
+
+
+def fit_size(size: Tuple[int, int], bounds: Tuple[int, int]) -> Tuple[int, int]:
+    scale = min(bounds[0] / size[0], bounds[1] / size[1])
+    return max(int(size[0] * scale), 1), max(int(size[1] * scale), 1)
+
+
+class ImagePlayer:
+    # Plays a static image, an animated GIF or a numbered frame sequence. A
+    # decoder thread loads and pre-scales frames into a bounded queue, so the
+    # render loop only ever blits a ready surface and memory stays at
+    # `prefetch` frames however long the animation is.
+
+    def __init__(self, path: str, screen_size: Tuple[int, int], loop: bool = True,
+                 fps: Optional[float] = None, prefetch: int = DEFAULT_PREFETCH):
+        self.path = path
+        self.screen_size = screen_size
+        self.loop = loop
+        self.frame_duration = 1.0 / fps if fps else None
+        self.prefetch = max(prefetch, 1)
+        self.position = (0, 0)
+        self.finished = False
+        self.failed = False
+        self.stalls = 0
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.prefetch)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._frame: Optional[pygame.Surface] = None
+        self._next_frame_time: Optional[float] = None
+        # Animations short enough to fit the prefetch window are kept and replayed from memory
+        self._resident: Optional[List[Tuple[pygame.Surface, float]]] = None
+        self._resident_index = 0
+
+    @property
+    def is_static(self) -> bool:
+        # True once the shown frame will not change again by itself
+        return self._frame is not None and (self.finished or self._next_frame_time == float("inf"))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._decode, name="image-decoder", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(JOIN_TIMEOUT)
+            if self._thread.is_alive():
+                logger.warning(f"Decoder for {self.path} did not stop within {JOIN_TIMEOUT}s")
+            self._thread = None
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode(self):
+        try:
+            first_pass = True
+            while not self._stop.is_set():
+                frames = []
+                for frame in self._frames():
+                    if first_pass and frames is not None:
+                        frames.append(frame)
+                        if len(frames) > self.prefetch:
+                            frames = None
+                    if not self._put(frame):
+                        return
+                if first_pass and frames is not None:
+                    self._put((_END, frames))
+                    return
+                first_pass = False
+                if not self.loop:
+                    self._put((_END, None))
+                    return
+        except Exception as e:
+            logger.error(f"Failed to decode {self.path}: {e}", exc_info=True)
+            self.failed = True
+            self._put((_END, None))
+
+    def _frames(self) -> Iterator[Tuple[pygame.Surface, float]]:
+        paths = sequence_paths(self.path)
+        if paths:
+            duration = self.frame_duration or DEFAULT_FRAME_DURATION
+            for path in paths:
+                if self._stop.is_set():
+                    return
+                yield self._prepare(pygame.image.load(path)), duration
+        elif self.path.lower().endswith(".gif"):
+            yield from self._gif_frames()
+        else:
+            yield self._prepare(pygame.image.load(self.path)), self.frame_duration or 0.0
+
+    def _gif_frames(self) -> Iterator[Tuple[pygame.Surface, float]]:
+        try:
+            from PIL import Image, ImageSequence
+        except ImportError:
+            global _pillow_warned
+            if not _pillow_warned and gif_frame_count(self.path) > 1:
+                _pillow_warned = True
+                logger.warning(f"Pillow is not installed, animated GIFs such as {self.path} "
+                               f"show only their first frame (pip install Pillow)")
+            yield self._prepare(pygame.image.load(self.path)), 0.0
+            return
+
+        with Image.open(self.path) as image:
+            for frame in ImageSequence.Iterator(image):
+                if self._stop.is_set():
+                    return
+                rgba = frame.convert("RGBA")
+                surface = pygame.image.frombuffer(rgba.tobytes(), rgba.size, "RGBA")
+                duration = frame.info.get("duration")
+                yield self._prepare(surface), (
+                    self.frame_duration or (duration / 1000.0 if duration else DEFAULT_FRAME_DURATION)
+                )
+
+    def _prepare(self, surface: pygame.Surface) -> pygame.Surface:
+        size = fit_size(surface.get_size(), self.screen_size)
+        if size != surface.get_size():
+            if surface.get_bitsize() < 24:
+                # smoothscale needs 24/32-bit pixels; a blit converts paletted images without a display
+                widened = pygame.Surface(surface.get_size(), pygame.SRCALPHA, 32)
+                widened.blit(surface, (0, 0))
+                surface = widened
+            surface = pygame.transform.smoothscale(surface, size)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        return surface
+
+    def _next_frame(self) -> Optional[Tuple[pygame.Surface, float]]:
+        if self._resident is not None:
+            if self._resident_index >= len(self._resident):
+                if not self.loop:
+                    self.finished = True
+                    return None
+                self._resident_index = 0
+            frame = self._resident[self._resident_index]
+            self._resident_index += 1
+            return frame
+
+        try:
+            item = self._queue.get_nowait()
+        except queue.Empty:
+            return None
+        if item[0] is not _END:
+            return item
+
+        frames = item[1]
+        if not frames or not self.loop:
+            self.finished = True
+            return None
+        # The first pass held every frame, replay them instead of decoding again
+        self._resident = frames
+        self._resident_index = 0
+        return self._next_frame()
+
+    def frame(self, now: float) -> Tuple[Optional[pygame.Surface], bool]:
+        # Returns the frame to show at `now` and whether it changed since the last call
+        if self.finished or (self._next_frame_time is not None and now < self._next_frame_time):
+            return self._frame, False
+
+        upcoming = self._next_frame()
+        if upcoming is None:
+            if self._frame is not None and not self.finished:
+                self.stalls += 1
+            return self._frame, False
+
+        surface, duration = upcoming
+        if not duration:
+            self._next_frame_time = float("inf")
+        elif self._next_frame_time is None or self._next_frame_time + duration < now:
+            self._next_frame_time = now + duration
+        else:
+            # Keep the animation's own cadence regardless of when the tick landed
+            self._next_frame_time += duration
+        self._frame = surface
+        self.position = ((self.screen_size[0] - surface.get_width()) // 2,
+                         (self.screen_size[1] - surface.get_height()) // 2)
+        return surface, True
@@ -2,35 +2,70 @@ import pygame
 import os
 
 class ValorantInfoRenderer:
-    def __init__(self, screen, project_root):
+    ICON_SIZE = (156, 156)
+    FONT_SIZE = 36
+    TEXT_COLOR = (255, 255, 255)
+
+    def __init__(self, screen, project_root, background_color=(0, 0, 0)):
         self.screen = screen
         self.project_root = project_root
+        self.background_color = background_color
 
-    def render(self, valorant_info):
+        # The card only changes with the data, so it is composed once and blitted afterwards
+        self._font = None
+        self._icons = {}
+        self._card = None
+        self._card_key = None
+
+    def _get_font(self):
+        if self._font is None:
+            self._font = pygame.font.SysFont(None, self.FONT_SIZE)
+        return self._font
+
+    def _get_icon(self, rank_icon_path):
+        if rank_icon_path in self._icons:
+            return self._icons[rank_icon_path]
+
+        icon = None
+        full_path = os.path.join(self.project_root, rank_icon_path)
+        if os.path.exists(full_path):
+            try:
+                icon = pygame.transform.scale(pygame.image.load(full_path), self.ICON_SIZE)
+                if pygame.display.get_surface() is not None:
+                    icon = icon.convert_alpha()
+            except Exception as e:
+                print(f"Failed to load rank icon {full_path}: {e}")
+        else:
+            print(f"Rank icon not found: {full_path}")
+        # Failures are cached too, a missing file is not retried every frame
+        self._icons[rank_icon_path] = icon
+        return icon
+
+    def compose(self, valorant_info):
+        # Returns the card surface and whether it was rebuilt
         account_info = valorant_info.get('account_info', {})
         rank = account_info.get('rank', 'Unknown')
         rr = account_info.get('rr', 0)
         rank_icon_path = valorant_info.get('rank_icon', '')
 
+        key = (rank, rr, rank_icon_path, self.screen.get_size())
+        if self._card is not None and key == self._card_key:
+            return self._card, False
+
         screen_width, screen_height = self.screen.get_size()
+        card = pygame.Surface((screen_width, screen_height))
+        card.fill(self.background_color)
 
         if rank_icon_path:
-            full_path = os.path.join(self.project_root, rank_icon_path)
-            if os.path.exists(full_path):
-                try:
-                    rank_icon = pygame.image.load(full_path)
-                    scaled_icon = pygame.transform.scale(rank_icon, (156, 156))
-                    icon_x = (screen_width - 156) // 2
-                    icon_y = 10
-                    self.screen.blit(scaled_icon, (icon_x, icon_y))
-                except Exception as e:
-                    print(f"Failed to load rank icon {full_path}: {e}")
-            else:
-                print(f"Rank icon not found: {full_path}")
-
-        font_large = pygame.font.SysFont(None, 36)
-        rank_surface = font_large.render(f"{rank}", True, (255, 255, 255))
-        rr_surface = font_large.render(f"{rr} RR", True, (255, 255, 255))
+            rank_icon = self._get_icon(rank_icon_path)
+            if rank_icon is not None:
+                icon_x = (screen_width - self.ICON_SIZE[0]) // 2
+                icon_y = 10
+                card.blit(rank_icon, (icon_x, icon_y))
+
+        font_large = self._get_font()
+        rank_surface = font_large.render(f"{rank}", True, self.TEXT_COLOR)
+        rr_surface = font_large.render(f"{rr} RR", True, self.TEXT_COLOR)
 
         bottom_margin = 10
         total_text_height = rank_surface.get_height() + rr_surface.get_height() + 10
@@ -40,5 +75,16 @@ class ValorantInfoRenderer:
         rr_x = (screen_width - rr_surface.get_width()) // 2
         rr_y = rank_y + rank_surface.get_height() + 10
 
-        self.screen.blit(rank_surface, (rank_x, rank_y))
-        self.screen.blit(rr_surface, (rr_x, rr_y))
+        card.blit(rank_surface, (rank_x, rank_y))
+        card.blit(rr_surface, (rr_x, rr_y))
+
+        if pygame.display.get_surface() is not None:
+            card = card.convert()
+        self._card = card
+        self._card_key = key
+        return card, True
+
+    def render(self, valorant_info):
+        card, changed = self.compose(valorant_info)
+        self.screen.blit(card, (0, 0))
+        return changed
@@ -1,20 +1,35 @@
 import pygame
-from typing import Tuple
-from modules.display.animations import AnimationType, AnimationState
-from utils.helpers import lerp, ease_in_out, draw_heart
+from typing import Dict, List, Optional, Tuple
+from modules.display.animations import AnimationType, AnimationState, Timeline, load_timelines
+from modules.display.sprite_cache import SpriteCache, quantize
+from utils.clock import now
+from utils.helpers import lerp
 
 
 class RoboEye:
     
     BLINK_DURATION = 0.15
     SMILE_DURATION = 0.7
-    SMILE_HEIGHT_FACTOR = 0.6
-    SMILE_TOP_RADIUS_FACTOR = 0.8
     HEART_DURATION = 1.0
-    HEART_ANIMATION_PHASE = 0.3
+    GLOW_COLOR = (255, 255, 255)
+    GLOW_ALPHA = 40
+    # Timeline properties and the attributes they drive
+    TIMELINE_ATTRIBUTES = {
+        "height": ("current_height",),
+        "top_radius": ("border_top_left", "border_top_right"),
+        "bottom_radius": ("border_bottom_left", "border_bottom_right"),
+        "scale": ("heart_scale",),
+    }
+    # Base geometry keyframe expressions may refer to, see timeline_variables()
+    TIMELINE_VARIABLES = ("width", "height", "radius")
     
-    def __init__(self, center_x: float, center_y: float, width: float, height: float, config):
+    def __init__(self, center_x: float, center_y: float, width: float, height: float, config,
+                 sprite_cache: Optional[SpriteCache] = None,
+                 timelines: Optional[Dict[str, Timeline]] = None):
         self.config = config
+        if sprite_cache is None:
+            sprite_cache = SpriteCache(config.SPRITE_CACHE_BYTES, config.SPRITE_QUANTUM)
+        self.sprite_cache = sprite_cache
         self.center_x = center_x
         self.center_y = center_y
         self.width = width
@@ -41,6 +56,15 @@ class RoboEye:
         self.smile_delay_start_time = None
         
         self.heart_scale = 0.0
+        # Glow layers actually drawn, lowered by the display when it degrades
+        self.shadow_layers = config.SHADOW_LAYERS
+        
+        # Bound once against this eye's geometry, sampling a frame is table lookups
+        if timelines is None:
+            timelines = load_timelines()
+        variables = self.timeline_variables()
+        self.timelines = {anim_type: timelines[anim_type.value].bind(variables)
+                          for anim_type in self.animations}
     
     def _reset_border_radii(self):
         self.border_top_left = self.original_border_radius
@@ -72,90 +96,44 @@ class RoboEye:
         self.target_x = target_x
         self.target_y = target_y
     
-    def update(self):
+    def update(self, current_time: Optional[float] = None):
+        # current_time is the frame's single clock sample, taken here when not given
+        if current_time is None:
+            current_time = now()
         self.current_x = lerp(self.current_x, self.target_x, self.config.EYE_MOVE_SPEED)
         self.current_y = lerp(self.current_y, self.target_y, self.config.EYE_MOVE_SPEED)
         
         if self.animations[AnimationType.HEART].is_active:
-            self._update_heart_animation()
+            self._apply_timeline(AnimationType.HEART, current_time)
             return
         
         self.current_height = self.height
         self._reset_border_radii()
         
         if self.animations[AnimationType.BLINK].is_active:
-            self._update_blink_animation()
+            self._apply_timeline(AnimationType.BLINK, current_time)
         
         if self.animations[AnimationType.SMILE].is_active:
-            self._update_smile_animation()
+            self._apply_timeline(AnimationType.SMILE, current_time)
         
         self._update_perspective()
     
-    def _update_heart_animation(self):
-        anim = self.animations[AnimationType.HEART]
-        progress = anim.get_progress()
-        
-        if progress < self.HEART_ANIMATION_PHASE:
-            phase_progress = progress / self.HEART_ANIMATION_PHASE
-            self.heart_scale = ease_in_out(phase_progress)
-        else:
-            self.heart_scale = 1.0
-        
-        if anim.is_finished():
+    def _apply_timeline(self, anim_type: AnimationType, current_time: float):
+        anim = self.animations[anim_type]
+        self.apply_timeline_values(self.timelines[anim_type].sample(anim.get_progress(current_time)))
+        if anim.is_finished(current_time):
             anim.stop()
-            self.heart_scale = 0.0
+            if anim_type == AnimationType.HEART:
+                self.heart_scale = 0.0
     
-    def _update_blink_animation(self):
-        anim = self.animations[AnimationType.BLINK]
-        progress = anim.get_progress()
-        
-        if progress < 0.5:
-            self.current_height = self.height * (1 - progress * 2)
-        else:
-            self.current_height = self.height * ((progress - 0.5) * 2)
-        
-        if anim.is_finished():
-            anim.stop()
+    def apply_timeline_values(self, values: Dict[str, float]):
+        for name, value in values.items():
+            for attribute in self.TIMELINE_ATTRIBUTES.get(name, ()):
+                setattr(self, attribute, value)
     
-    def _update_smile_animation(self):
-        anim = self.animations[AnimationType.SMILE]
-        progress = anim.get_progress()
-        
-        target_height = self.height * self.SMILE_HEIGHT_FACTOR
-        target_top_radius = target_height * self.SMILE_TOP_RADIUS_FACTOR
-        target_bottom_radius = self.original_border_radius * 0.5
-        
-        phase_duration = 1.0 / 3.0
-        
-        if progress < phase_duration:
-            phase_progress = progress / phase_duration
-            t = ease_in_out(phase_progress)
-            self.current_height = lerp(self.height, target_height, t)
-            self.border_bottom_left = self.border_bottom_right = lerp(
-                self.original_border_radius, target_bottom_radius, t
-            )
-            self.border_top_left = self.border_top_right = lerp(
-                self.original_border_radius, target_top_radius, t
-            )
-        
-        elif progress < 1.0 - phase_duration:
-            self.current_height = target_height
-            self.border_bottom_left = self.border_bottom_right = target_bottom_radius
-            self.border_top_left = self.border_top_right = target_top_radius
-        
-        else:
-            phase_progress = (progress - (1.0 - phase_duration)) / phase_duration
-            t = ease_in_out(phase_progress)
-            self.current_height = lerp(target_height, self.height, t)
-            self.border_bottom_left = self.border_bottom_right = lerp(
-                target_bottom_radius, self.original_border_radius, t
-            )
-            self.border_top_left = self.border_top_right = lerp(
-                target_top_radius, self.original_border_radius, t
-            )
-        
-        if anim.is_finished():
-            anim.stop()
+    def timeline_variables(self) -> Dict[str, float]:
+        # What keyframe expressions may refer to
+        return dict(zip(self.TIMELINE_VARIABLES, (self.width, self.height, self.original_border_radius)))
     
     def _update_perspective(self):
         offset_from_center = (self.current_x + self.width / 2) - self.center_x
@@ -163,52 +141,73 @@ class RoboEye:
         normalized_offset = offset_from_center / max_h_offset if max_h_offset != 0 else 0
         self.current_width = self.width - abs(normalized_offset) * self.config.PERSPECTIVE_SHIFT
     
-    def draw(self, surface: pygame.Surface):
+    def layout(self) -> List[Tuple[pygame.Surface, Tuple[int, int]]]:
+        # The sprite blits that make up this frame, in drawing order
         if self.animations[AnimationType.HEART].is_active and self.heart_scale > 0:
-            heart_size = self.width * 0.9 * self.heart_scale
-            draw_heart(surface, self.config.HEART_COLOR, self.center_x, 
-                      self.center_y, heart_size)
-            return
+            heart = self.sprite_cache.heart_sprite(self.width * 0.9 * self.heart_scale,
+                                                   self.config.HEART_COLOR)
+            if heart is None:
+                return []
+            sprite, (offset_x, offset_y) = heart
+            return [(sprite, (int(self.center_x + offset_x), int(self.center_y + offset_y)))]
         
         draw_x = self.current_x + (self.width - self.current_width) / 2
         draw_y = self.current_y + (self.height - self.current_height) / 2
-        
-        self._draw_shadows(surface, draw_x, draw_y)
-        
-        radii = {
-            'border_top_left_radius': int(self.border_top_left),
-            'border_top_right_radius': int(self.border_top_right),
-            'border_bottom_left_radius': int(self.border_bottom_left),
-            'border_bottom_right_radius': int(self.border_bottom_right)
-        }
-        
-        rect = pygame.Rect(draw_x, draw_y, self.current_width, self.current_height)
-        pygame.draw.rect(surface, self.config.EYE_COLOR, rect, **radii)
-    
-    def _draw_shadows(self, surface: pygame.Surface, draw_x: float, draw_y: float):
-        for i in range(self.config.SHADOW_LAYERS, 0, -1):
-            layer_size = self.config.SHADOW_SPREAD * (i / self.config.SHADOW_LAYERS)
-            alpha = int(40 * (i / self.config.SHADOW_LAYERS))
-            
-            shadow_width = self.current_width + layer_size * 2
-            shadow_height = self.current_height + layer_size * 2
-            shadow_surface = pygame.Surface((shadow_width, shadow_height), 
-                                           pygame.SRCALPHA)
-            
-            radii = {
-                'border_top_left_radius': int(self.border_top_left),
-                'border_top_right_radius': int(self.border_top_right),
-                'border_bottom_left_radius': int(self.border_bottom_left),
-                'border_bottom_right_radius': int(self.border_bottom_right)
-            }
-            
-            pygame.draw.rect(shadow_surface, (255, 255, 255, alpha),
-                           shadow_surface.get_rect(topleft=(0, 0)), **radii)
-            
-            surface.blit(shadow_surface, (draw_x - layer_size, draw_y - layer_size))
+        radii = (self.border_top_left, self.border_top_right,
+                 self.border_bottom_left, self.border_bottom_right)
+        blits = []
+        
+        glow = self.sprite_cache.glow_sprite(
+            self.current_width, self.current_height, radii,
+            self.GLOW_COLOR, self.shadow_layers, self.config.SHADOW_SPREAD, self.GLOW_ALPHA,
+            self.config.BACKGROUND_COLOR
+        )
+        if glow is not None:
+            sprite, padding = glow
+            blits.append((sprite, self._centered(sprite, draw_x, draw_y, padding)))
+        
+        sprite = self.sprite_cache.eye_sprite(self.current_width, self.current_height, radii,
+                                              self.config.EYE_COLOR)
+        if sprite is not None:
+            blits.append((sprite, self._centered(sprite, draw_x, draw_y)))
+        return blits
+    
+    def draw(self, surface: pygame.Surface) -> pygame.Rect:
+        # Returns the area actually touched, which is what has to be cleared next frame
+        dirty = None
+        for sprite, position in self.layout():
+            drawn = surface.blit(sprite, position)
+            dirty = dirty.union(drawn) if dirty else drawn
+        return dirty or pygame.Rect(int(self.current_x), int(self.current_y), 0, 0)
+    
+    def _centered(self, sprite: pygame.Surface, draw_x: float, draw_y: float,
+                  padding: int = 0) -> Tuple[int, int]:
+        # Sprites are quantized, keep them centred on the rect they stand in for
+        width = int(self.current_width) + padding * 2
+        height = int(self.current_height) + padding * 2
+        return (int(draw_x) - padding + (width - sprite.get_width()) // 2,
+                int(draw_y) - padding + (height - sprite.get_height()) // 2)
+    
+    def visual_state(self) -> tuple:
+        # Everything draw() depends on, at the precision it draws with
+        if self.animations[AnimationType.HEART].is_active and self.heart_scale > 0:
+            return ("heart", quantize(self.width * 0.9 * self.heart_scale, self.sprite_cache.quantum))
+        draw_x = self.current_x + (self.width - self.current_width) / 2
+        draw_y = self.current_y + (self.height - self.current_height) / 2
+        quantum = self.sprite_cache.quantum
+        return (int(draw_x), int(draw_y), int(self.current_width), int(self.current_height),
+                quantize(self.current_width, quantum), quantize(self.current_height, quantum),
+                int(self.border_top_left), int(self.border_top_right),
+                int(self.border_bottom_left), int(self.border_bottom_right),
+                self.shadow_layers)
+    
+    def is_settled(self, tolerance: float = 0.5) -> bool:
+        return (not self._is_any_animation_active() and
+                abs(self.current_x - self.target_x) < tolerance and
+                abs(self.current_y - self.target_y) < tolerance)
     
     def get_bounding_rect(self) -> pygame.Rect:
-        padding = self.config.SHADOW_SPREAD if self.config.SHADOW_LAYERS > 0 else 0
+        padding = self.config.SHADOW_SPREAD if self.shadow_layers > 0 else 0
         draw_x = self.current_x + (self.width - self.current_width) / 2 - padding
         draw_y = self.current_y + (self.height - self.current_height) / 2 - padding
         width = self.current_width + padding * 2
@@ -0,0 +1,182 @@
+import pygame
+import logging
+from collections import OrderedDict
+from typing import Callable, Hashable, List, Optional, Tuple
+from utils.helpers import draw_heart
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+
+def quantize(value: float, quantum: int) -> int:
+    return int(round(value / quantum)) * quantum if quantum > 1 else int(value)
+
+
+def _colorkey_for(color: Tuple[int, int, int]) -> Tuple[int, int, int]:
+    key = (255, 0, 255)
+    return key if tuple(color[:3]) != key else (0, 255, 0)
+
+
+class SpriteCache:
+    # LRU of pre-rendered surfaces bounded by their pixel memory. Blink and
+    # smile replay the same few shapes every cycle, so after the first pass
+    # drawing an eye is a single blit instead of a rounded-rect rasterization.
+    # Misses are looked up in the baked atlas, if any, before rendering.
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, quantum: int = 1, atlas=None):
+        self.max_bytes = max_bytes
+        self.quantum = max(int(quantum), 1)
+        self.atlas = atlas
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sprites: "OrderedDict[Hashable, pygame.Surface]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sprites)
+
+    @staticmethod
+    def _size_of(surface: pygame.Surface) -> int:
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def get(self, key: Hashable, render: Callable[[], pygame.Surface]) -> pygame.Surface:
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        sprite = self.atlas.get(key) if self.atlas is not None else None
+        if sprite is None:
+            sprite = render()
+        size = self._size_of(sprite)
+        if size > self.max_bytes:
+            return sprite
+
+        self._sprites[key] = sprite
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, evicted = self._sprites.popitem(last=False)
+            self.bytes -= self._size_of(evicted)
+            self.evictions += 1
+        return sprite
+
+    def eye_sprite(self, width: float, height: float, radii: Tuple[float, float, float, float],
+                   color: Tuple[int, int, int]) -> Optional[pygame.Surface]:
+        # radii are (top_left, top_right, bottom_left, bottom_right)
+        width = quantize(width, self.quantum)
+        height = quantize(height, self.quantum)
+        if width <= 0 or height <= 0:
+            return None
+        key = ("eye", width, height, tuple(int(radius) for radius in radii), tuple(color))
+        return self.get(key, lambda: self._render_eye(width, height, key[3], color))
+
+    @staticmethod
+    def _render_eye(width: int, height: int, radii: Tuple[int, int, int, int],
+                    color: Tuple[int, int, int]) -> pygame.Surface:
+        colorkey = _colorkey_for(color)
+        sprite = pygame.Surface((width, height))
+        sprite.fill(colorkey)
+        top_left, top_right, bottom_left, bottom_right = radii
+        pygame.draw.rect(sprite, color, sprite.get_rect(),
+                         border_top_left_radius=top_left,
+                         border_top_right_radius=top_right,
+                         border_bottom_left_radius=bottom_left,
+                         border_bottom_right_radius=bottom_right)
+        # Match the screen's pixel format so blits skip per-pixel conversion
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()
+        sprite.set_colorkey(colorkey, pygame.RLEACCEL)
+        return sprite
+
+    def glow_sprite(self, width: float, height: float, radii: Tuple[float, float, float, float],
+                    color: Tuple[int, int, int], layers: int, spread: float,
+                    max_alpha: int = 40, background: Tuple[int, int, int] = (0, 0, 0)
+                    ) -> Optional[Tuple[pygame.Surface, int]]:
+        # Every shadow layer flattened over `background` into one colour-keyed
+        # surface, padded by `spread` on each side; returns the surface and that
+        # padding. Only valid drawn over that background, which is what the eyes sit on.
+        width = quantize(width, self.quantum)
+        height = quantize(height, self.quantum)
+        if layers <= 0 or spread <= 0 or width < 0 or height < 0:
+            return None
+        key = ("glow", width, height, tuple(int(radius) for radius in radii), tuple(color),
+               layers, spread, max_alpha, tuple(background))
+        sprite = self.get(key, lambda: self._render_glow(width, height, key[3], color,
+                                                          layers, spread, max_alpha, background))
+        return sprite, int(spread)
+
+    @staticmethod
+    def _render_glow(width: int, height: int, radii: Tuple[int, int, int, int],
+                     color: Tuple[int, int, int], layers: int, spread: float,
+                     max_alpha: int, background: Tuple[int, int, int]) -> pygame.Surface:
+        padding = int(spread)
+        size = (width + padding * 2, height + padding * 2)
+        # The layers are blended onto the background exactly as they used to be blended
+        # onto the screen, rounding included; a flattened alpha surface cannot reproduce
+        # SDL's per-blit rounding. `coverage` records which pixels any layer touched.
+        glow = pygame.Surface(size)
+        glow.fill(background)
+        coverage = pygame.Surface(size, pygame.SRCALPHA)
+        top_left, top_right, bottom_left, bottom_right = radii
+
+        # Outermost layer first, the same order the layers used to be blended onto the screen
+        for i in range(layers, 0, -1):
+            layer_size = spread * (i / layers)
+            alpha = int(max_alpha * (i / layers))
+            layer = pygame.Surface((width + layer_size * 2, height + layer_size * 2), pygame.SRCALPHA)
+            pygame.draw.rect(layer, (*color[:3], alpha), layer.get_rect(),
+                             border_top_left_radius=top_left,
+                             border_top_right_radius=top_right,
+                             border_bottom_left_radius=bottom_left,
+                             border_bottom_right_radius=bottom_right)
+            position = (padding - layer_size, padding - layer_size)
+            glow.blit(layer, position)
+            coverage.blit(layer, position)
+
+        colorkey = _colorkey_for(color)
+        pygame.mask.from_surface(coverage, 0).to_surface(glow, setcolor=None, unsetcolor=colorkey)
+        if pygame.display.get_surface() is not None:
+            glow = glow.convert()
+        glow.set_colorkey(colorkey, pygame.RLEACCEL)
+        return glow
+
+    def heart_sprite(self, size: float, color: Tuple[int, int, int]) -> Optional[Tuple[pygame.Surface, Tuple[float, float]]]:
+        # Returns the sprite and where its origin sits relative to the heart's centre
+        size = quantize(size, self.quantum)
+        if size <= 0:
+            return None
+        key = ("heart", size, tuple(color))
+        sprite = self.get(key, lambda: self._render_heart(size, color))
+        return sprite, (-size * 0.5, -size * 0.9)
+
+    @staticmethod
+    def _render_heart(size: int, color: Tuple[int, int, int]) -> pygame.Surface:
+        colorkey = _colorkey_for(color)
+        sprite = pygame.Surface((size + 1, int(size * 1.15) + 1))
+        sprite.fill(colorkey)
+        draw_heart(sprite, color, size * 0.5, size * 0.9, size)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()
+        sprite.set_colorkey(colorkey, pygame.RLEACCEL)
+        return sprite
+
+    def sprites(self) -> List[Tuple[Hashable, pygame.Surface]]:
+        # Least recently used first
+        return list(self._sprites.items())
+
+    def clear(self):
+        self._sprites.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "sprites": len(self._sprites),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -1,3 +0,0 @@
-from modules.network.network_module import NetworkModule
-
-__all__ = ['NetworkModule']
@@ -1,12 +1,14 @@
 import logging
 import requests
-import time
 import os
+import time
 from core.event_manager import EventManager, EventType
 from typing import Dict, Any, Optional, Callable
 from threading import Thread, Lock
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, Future
 from modules.base_module import BaseModule
+from utils import clock
+from utils.metrics import Histogram
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +17,8 @@ ASSETS_IMG_DIR = os.path.join(PROJECT_ROOT, "assets", "img")
 
 class NetworkModule(BaseModule):
 
+    IDLE_UPDATE_INTERVAL = 60.0
+
     def __init__(self, config):
         super().__init__(config)
         self.session = None
@@ -24,9 +28,21 @@ class NetworkModule(BaseModule):
         self._last_mmr_update = 0
         self._mmr_future: Optional[Future] = None
         self._mmr_result_cache = None
+
+        self.request_latency = Histogram()
+        self.request_errors = 0
+        self._metrics_lock = Lock()
     
     def get_name(self) -> str:
         return "network"
+
+    def get_next_update_time(self, now: float) -> Optional[float]:
+        # Only wake up when the next MMR fetch is due
+        if not getattr(self.config, "VALORANT_ENABLED", False):
+            return now + self.IDLE_UPDATE_INTERVAL
+        interval = getattr(self.config, "VALORANT_UPDATE_INTERVAL", 86400)
+        remaining = interval - (clock.now() - self._last_mmr_update)
+        return now + min(max(remaining, 0.0), self.IDLE_UPDATE_INTERVAL)
     
     def initialize(self):
         logger.info("Initializing network module")
@@ -47,52 +63,88 @@ class NetworkModule(BaseModule):
         logger.info("Network module initialized")
     
     def update(self):
-        now = time.time()
+        now = clock.now()
         interval = getattr(self.config, "VALORANT_UPDATE_INTERVAL", 86400)
         enabled = getattr(self.config, "VALORANT_ENABLED", False)
-        if enabled and (now - self._last_mmr_update >= interval) and self._mmr_future is None:
+        with self.lock:
+            if not enabled or self._mmr_future is not None:
+                return
+            if now - self._last_mmr_update < interval:
+                return
+
             region = self.config.VALORANT_REGION
             platform = self.config.VALORANT_PLATFORM
             username = self.config.VALORANT_USERNAME
             tag = self.config.VALORANT_TAG
             api_key = self.config.VALORANT_API_KEY
 
-            # Launch in background thread
-            self._mmr_future = self.executor.submit(
+            # Launch in background thread, the result is posted back onto the bus
+            future = self.executor.submit(
                 self.fetch_valorant_mmr, region, platform, username, tag, api_key
             )
+            self._mmr_future = future
             self._last_mmr_update = now
+        future.add_done_callback(self._on_mmr_fetched)
 
-        # Check if background fetch completed
-        if self._mmr_future is not None and self._mmr_future.done():
-            result = self._mmr_future.result()
+    def _on_mmr_fetched(self, future: Future):
+        # Runs on the executor thread
+        try:
+            result = future.result()
             if result:
-                # Parse and handle result in main thread
                 parsed = self.parse_valorant_mmr_data(result)
-                self.handle_valorant_mmr(parsed)
                 self._mmr_result_cache = parsed  # Optional: cache for quick access elsewhere
-            self._mmr_future = None  # Allow next fetch in future
-    
-    
+                self.handle_valorant_mmr(parsed)
+        except Exception as e:
+            logger.error(f"Valorant MMR fetch failed: {e}", exc_info=True)
+        finally:
+            with self.lock:
+                self._mmr_future = None  # Allow next fetch in future
+    
+    
+    def get_metrics(self):
+        with self._metrics_lock:
+            return {
+                "request_seconds": self.request_latency,
+                "request_errors_total": self.request_errors,
+            }
+
     def request(self, method: str, url: str, **kwargs) -> Optional[Dict]:
+        # Called from several worker threads at once
+        started = time.perf_counter()
+        failed = True
         try:
             kwargs.setdefault('timeout', self.config.TIMEOUT)
             
             response = self.session.request(method, url, **kwargs)
             response.raise_for_status()
             
-            return response.json() if response.content else {}
+            result = response.json() if response.content else {}
+            failed = False
+            return result
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Request failed: {method} {url} - {e}")
             return None
+        finally:
+            with self._metrics_lock:
+                self.request_latency.observe(time.perf_counter() - started)
+                self.request_errors += failed
     
     def request_async(self, method: str, url: str, 
-                     callback: Optional[Callable] = None, **kwargs):
+                     callback: Optional[Callable] = None,
+                     response_event: Optional[EventType] = None, **kwargs):
+        # callback runs on the worker thread; pass response_event to receive
+        # the result on the main loop through the event bus instead
         def _request_worker():
             data = self.request(method, url, **kwargs)
             if callback:
                 callback(data)
+            if response_event and self.event_manager:
+                self.event_manager.emit_threadsafe(
+                    response_event,
+                    data={'method': method, 'url': url, 'response': data},
+                    source=self.get_name()
+                )
         
         if self.executor:
             self.executor.submit(_request_worker)
@@ -180,7 +232,7 @@ class NetworkModule(BaseModule):
         if self.event_manager:
             image_rel_path = "asc_3.png"
             image_path = os.path.join("assets", "img", image_rel_path)
-            self.event_manager.emit(
+            self.event_manager.emit_threadsafe(
                 EventType.DISPLAY_VALORANT_INFO,
                 data={
                     'account_info': parsed,
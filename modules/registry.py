@@ -0,0 +1,58 @@
+import logging
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Type
+from modules.base_module import BaseModule
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ModuleSpec:
+    import_path: str
+    class_name: str
+    config_key: str
+
+
+# Module classes are only imported once they are enabled, so pygame,
+# requests and friends stay out of the startup path until needed
+MODULE_REGISTRY: Dict[str, ModuleSpec] = {
+    'display': ModuleSpec('modules.display.display_module', 'DisplayModule', 'DISPLAY'),
+    'network': ModuleSpec('modules.network.network_module', 'NetworkModule', 'NETWORK'),
+    'camera': ModuleSpec('modules.camera.camera_module', 'CameraModule', 'CAMERA'),
+    'audio': ModuleSpec('modules.audio.audio_module', 'AudioModule', 'AUDIO'),
+    'sensors': ModuleSpec('modules.sensors.sensor_module', 'SensorModule', 'SENSOR'),
+}
+
+
+def register_module_type(name: str, import_path: str, class_name: str, config_key: str):
+    MODULE_REGISTRY[name] = ModuleSpec(import_path, class_name, config_key)
+
+
+def load_module_class(name: str) -> Type[BaseModule]:
+    spec = MODULE_REGISTRY.get(name)
+    if spec is None:
+        raise KeyError(f"Unknown module: {name}")
+    # __import__ (not importlib) so an installed ImportProfiler sees the top-level import too
+    __import__(spec.import_path)
+    return getattr(sys.modules[spec.import_path], spec.class_name)
+
+
+def create_module(name: str, robot_config) -> BaseModule:
+    module_class = load_module_class(name)
+    return module_class(getattr(robot_config, MODULE_REGISTRY[name].config_key))
+
+
+def create_enabled_modules(robot_config, startup=None) -> List[BaseModule]:
+    modules = []
+    for name in robot_config.ENABLED_MODULES:
+        if startup:
+            startup.start(f"import:{name}")
+        try:
+            modules.append(create_module(name, robot_config))
+        except Exception as e:
+            logger.error(f"Failed to load module {name}: {e}", exc_info=True)
+        finally:
+            if startup:
+                startup.stop(f"import:{name}")
+    return modules
@@ -0,0 +1,52 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.profiler import SamplingProfiler
+
+
+def _sample(profiler: SamplingProfiler, rounds: int = 20):
+    for _ in range(rounds):
+        profiler.sample()
+        time.sleep(0.002)
+
+
+def test_idle_executor_workers_are_not_sampled():
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="idle-executor")
+    try:
+        # Both workers run once and then park on their work queue
+        for future in [executor.submit(time.sleep, 0.01) for _ in range(2)]:
+            future.result()
+        time.sleep(0.05)
+
+        profiler = SamplingProfiler(output_dir="unused")
+        _sample(profiler)
+    finally:
+        executor.shutdown()
+
+    assert profiler.idle_samples >= 2 * 20
+    assert not any(name.startswith("idle-executor") for name in profiler.modules)
+
+
+def test_busy_executor_workers_are_sampled():
+    stop = threading.Event()
+
+    def spin():
+        while not stop.is_set():
+            sum(range(100))
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="busy-executor")
+    try:
+        executor.submit(spin)
+        time.sleep(0.05)
+        profiler = SamplingProfiler(output_dir="unused")
+        _sample(profiler)
+    finally:
+        stop.set()
+        executor.shutdown()
+
+    assert profiler.modules["busy-executor_0"] > 0
@@ -0,0 +1,75 @@
+import os
+import sys
+
+# Must be set before pygame is imported anywhere
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import argparse
+import logging
+
+import pygame
+
+from config import RobotConfig
+from modules.display.animations import AnimationType
+from modules.display.atlas import config_fingerprint, write_atlas
+from modules.display.robo_eye import RoboEye
+from modules.display.sprite_cache import SpriteCache
+from utils.clock import SimulatedClock, set_clock
+
+logger = logging.getLogger(__name__)
+
+BAKED_ANIMATIONS = [AnimationType.BLINK, AnimationType.SMILE, AnimationType.HEART]
+
+
+def bake(config, steps: int) -> SpriteCache:
+    # Plays each animation on a centred eye at `steps` progress points and keeps
+    # every sprite the real drawing code asked for. Shake and nod only move the
+    # eyes, they reuse these shapes; looking sideways narrows the eye, those
+    # widths stay procedural.
+    clock = SimulatedClock()
+    set_clock(clock)
+    cache = SpriteCache(max_bytes=1 << 62, quantum=config.SPRITE_QUANTUM)
+    eye = RoboEye(config.SCREEN_WIDTH / 2, config.SCREEN_HEIGHT / 2,
+                  config.EYE_WIDTH, config.EYE_HEIGHT, config, cache)
+    scratch = pygame.Surface((config.SCREEN_WIDTH, config.SCREEN_HEIGHT))
+
+    # Degradation halves the glow, bake both so a degraded robot stays on the atlas
+    for layers in sorted({config.SHADOW_LAYERS, config.SHADOW_LAYERS // 2}):
+        eye.shadow_layers = layers
+        eye.update()
+        eye.draw(scratch)
+        for animation in BAKED_ANIMATIONS:
+            eye._stop_all_animations()
+            eye.start_animation(animation)
+            duration = eye.animations[animation].duration
+            for step in range(steps + 1):
+                eye.update()
+                eye.draw(scratch)
+                clock.advance(duration / steps)
+            eye._stop_all_animations()
+    return cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render the eye animations into a sprite atlas")
+    parser.add_argument("--output", default=os.path.join(PROJECT_ROOT, RobotConfig.DISPLAY.ATLAS_PATH),
+                        help="atlas pixel file, the index is written next to it as .json")
+    parser.add_argument("--steps", type=int, default=120,
+                        help="progress points sampled per animation")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    pygame.init()
+    config = RobotConfig.DISPLAY
+    cache = bake(config, max(args.steps, 1))
+    sprites = cache.sprites()
+    size = write_atlas(args.output, sprites, config_fingerprint(config))
+    logger.info(f"Baked {len(sprites)} sprites ({size / 1024:.0f} KiB) into {args.output}")
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
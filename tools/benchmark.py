@@ -0,0 +1,195 @@
+import os
+import sys
+
+# Must be set before pygame is imported anywhere
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import logging
+import random
+import resource
+import time
+import tracemalloc
+from typing import Dict, List
+
+from config import RobotConfig
+from core.event_manager import EventType
+from core.module_runner import ExecutionMode
+from core.robot_controller import RobotController
+from modules.base_module import BaseModule
+from modules.display.display_module import DisplayModule
+from utils.clock import SimulatedClock, set_clock, monotonic
+
+logger = logging.getLogger(__name__)
+
+ANIMATIONS = ["blink", "smile", "shake", "nod", "heart"]
+LOOK_DIRECTIONS = ["center", "left", "right", "up", "down", "up-left", "down-right"]
+
+
+class StubNetworkModule(BaseModule):
+    # Stands in for NetworkModule: no HTTP, just the events the real module produces
+
+    def __init__(self, config, info_interval: float):
+        super().__init__(config)
+        self.info_interval = info_interval
+        self._next_info = info_interval
+
+    def get_name(self) -> str:
+        return "network"
+
+    def get_update_interval(self) -> float:
+        return 1.0
+
+    def initialize(self):
+        self._initialized = True
+
+    def update(self):
+        if monotonic() >= self._next_info:
+            self._next_info += self.info_interval
+            self.event_manager.emit(
+                EventType.DISPLAY_VALORANT_INFO,
+                data={
+                    'account_info': {'user': 'bench#0000', 'rank': 'Ascendant 3', 'rr': random.randint(0, 99)},
+                    'rank_icon': os.path.join("assets", "img", "asc_3.png"),
+                    'duration': 5.0
+                },
+                source=self.get_name()
+            )
+
+    def shutdown(self):
+        pass
+
+
+class BenchmarkDisplayModule(DisplayModule):
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.frame_cpu: List[float] = []
+        self.frame_wall: List[float] = []
+
+    def update(self):
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        super().update()
+        self.frame_wall.append(time.perf_counter() - wall_start)
+        self.frame_cpu.append(time.process_time() - cpu_start)
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+    return {
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": pick(0.5) * 1000,
+        "p90_ms": pick(0.9) * 1000,
+        "p99_ms": pick(0.99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def run_benchmark(duration: float, seed: int, event_rate: float, info_interval: float,
+                  trace_memory: bool) -> Dict:
+    random.seed(seed)
+    clock = SimulatedClock()
+    set_clock(clock)
+
+    RobotConfig.DISPLAY.FULLSCREEN = False
+    RobotConfig.STARTUP.PARALLEL_INIT = False
+    RobotConfig.STARTUP.REPORT = False
+
+    controller = RobotController(RobotConfig)
+    display = BenchmarkDisplayModule(RobotConfig.DISPLAY)
+    controller.register_module(display)
+    controller.register_module(StubNetworkModule(RobotConfig.NETWORK, info_interval),
+                                mode=ExecutionMode.INLINE)
+
+    if trace_memory:
+        tracemalloc.start()
+
+    controller.running = True
+    controller.initialize_modules()
+    display.frame_cpu.clear()
+    display.frame_wall.clear()
+
+    next_event = random.expovariate(event_rate) if event_rate else float("inf")
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    while controller.running and clock.monotonic() < duration:
+        if clock.monotonic() >= next_event:
+            if random.random() < 0.5:
+                controller.event_manager.emit(EventType.DISPLAY_ANIMATION,
+                                              {'animation': random.choice(ANIMATIONS)}, "bench")
+            else:
+                controller.event_manager.emit(EventType.DISPLAY_LOOK,
+                                              {'direction': random.choice(LOOK_DIRECTIONS)}, "bench")
+            next_event += random.expovariate(event_rate)
+
+        controller.tick()
+        step = controller.scheduler.time_until_next(clock.monotonic())
+        clock.advance(min(step, next_event - clock.monotonic()) if step > 0 else 1e-6)
+    wall_time = time.perf_counter() - wall_start
+    cpu_time = time.process_time() - cpu_start
+
+    traced_peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    if trace_memory:
+        tracemalloc.stop()
+    controller.shutdown()
+
+    frames = len(display.frame_cpu)
+    return {
+        "simulated_seconds": duration,
+        "wall_seconds": wall_time,
+        "speedup": duration / wall_time if wall_time else None,
+        "frames": frames,
+        "fps_simulated": frames / duration,
+        "fps_throughput": frames / wall_time if wall_time else None,
+        "cpu_seconds": cpu_time,
+        "frame_cpu": percentiles(display.frame_cpu),
+        "frame_wall": percentiles(display.frame_wall),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "peak_traced_mb": traced_peak / (1024 * 1024) if traced_peak is not None else None,
+        "watchdog_level": controller.watchdog.level if controller.watchdog else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless end-to-end benchmark on a simulated clock")
+    parser.add_argument("--seconds", type=float, default=60.0, help="simulated time to run")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--event-rate", type=float, default=0.5,
+                        help="external animation/look events per simulated second")
+    parser.add_argument("--info-interval", type=float, default=20.0,
+                        help="simulated seconds between Valorant info cards")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also report the tracemalloc peak (slows the run down)")
+    parser.add_argument("--json", metavar="PATH", help="write the report as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    report = run_benchmark(args.seconds, args.seed, args.event_rate, args.info_interval,
+                           args.trace_memory)
+
+    print(f"Simulated {report['simulated_seconds']:.0f}s in {report['wall_seconds']:.2f}s "
+          f"({report['speedup']:.1f}x), {report['frames']} frames")
+    print(f"FPS: {report['fps_simulated']:.1f} simulated, {report['fps_throughput']:.0f} throughput")
+    cpu = report["frame_cpu"]
+    print(f"Frame CPU ms: mean {cpu['mean_ms']:.3f} p50 {cpu['p50_ms']:.3f} p90 {cpu['p90_ms']:.3f} "
+          f"p99 {cpu['p99_ms']:.3f} max {cpu['max_ms']:.3f}")
+    print(f"Peak RSS: {report['peak_rss_mb']:.1f} MB" +
+          (f", traced peak: {report['peak_traced_mb']:.1f} MB" if report['peak_traced_mb'] else ""))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
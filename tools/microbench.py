@@ -0,0 +1,289 @@
+import os
+import sys
+
+# Must be set before pygame is imported anywhere
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from typing import Callable, Dict, List, Tuple
+
+import pygame
+
+from config import RobotConfig
+from core.event_manager import EventManager, EventType
+from modules.display.animations import AnimationType
+from modules.display.display_module import DisplayModule
+from modules.display.eyes_controller import RoboEyesController
+from modules.display.robo_eye import RoboEye
+from utils.clock import SimulatedClock, set_clock
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "microbench.json")
+FRAME = 1.0 / RobotConfig.DISPLAY.FPS
+
+BENCHMARKS: Dict[str, Callable[[SimulatedClock], Callable[[], None]]] = {}
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _make_eye() -> RoboEye:
+    config = RobotConfig.DISPLAY
+    return RoboEye(config.SCREEN_WIDTH / 2, config.SCREEN_HEIGHT / 2,
+                  config.EYE_WIDTH, config.EYE_HEIGHT, config)
+
+
+def _cycle_animations(clock: SimulatedClock, eye: RoboEye, period: int = 60):
+    # Restart the blink/smile cycle so every phase of the hot path is sampled
+    state = {"frame": 0}
+    order = [AnimationType.BLINK, AnimationType.SMILE, AnimationType.HEART]
+
+    def step():
+        if state["frame"] % period == 0:
+            eye._stop_all_animations()
+            eye.start_animation(order[(state["frame"] // period) % len(order)])
+        state["frame"] += 1
+        clock.advance(FRAME)
+    return step
+
+
+@benchmark("robo_eye.update")
+def bench_eye_update(clock):
+    eye = _make_eye()
+    step = _cycle_animations(clock, eye)
+
+    def run():
+        step()
+        eye.update()
+    return run
+
+
+@benchmark("robo_eye.draw")
+def bench_eye_draw(clock):
+    eye = _make_eye()
+    step = _cycle_animations(clock, eye)
+    surface = pygame.Surface((RobotConfig.DISPLAY.SCREEN_WIDTH, RobotConfig.DISPLAY.SCREEN_HEIGHT))
+
+    def run():
+        step()
+        eye.update()
+        eye.draw(surface)
+    return run
+
+
+@benchmark("eyes_controller.update")
+def bench_controller_update(clock):
+    config = RobotConfig.DISPLAY
+    controller = RoboEyesController(config.SCREEN_WIDTH, config.SCREEN_HEIGHT, config)
+
+    def run():
+        clock.advance(FRAME)
+        controller.update()
+    return run
+
+
+def _bench_process_events(depth: int):
+    def setup(clock):
+        # Same limits as the controller's run loop, which calls process_events() once per tick
+        event_manager = EventManager(max_events_per_tick=RobotConfig.EVENTS.MAX_EVENTS_PER_TICK,
+                                     dispatch_budget=RobotConfig.EVENTS.DISPATCH_BUDGET, instrument=True)
+        sink = []
+        event_manager.subscribe(EventType.DISPLAY_ANIMATION, sink.append)
+        event_manager.subscribe(EventType.SENSOR_DATA, sink.append)
+
+        def run():
+            for index in range(depth):
+                if index % 4:
+                    event_manager.emit(EventType.DISPLAY_ANIMATION, {'animation': 'blink'}, "bench")
+                else:
+                    event_manager.emit(EventType.SENSOR_DATA, {'value': index}, f"sensor{index % 8}")
+            while event_manager.process_events():
+                pass
+            sink.clear()
+        return run
+    return setup
+
+
+for _depth in (1, 64, 1024):
+    benchmark(f"event_manager.process_events[{_depth}]")(_bench_process_events(_depth))
+
+
+def _display(clock) -> DisplayModule:
+    RobotConfig.DISPLAY.FULLSCREEN = False
+    display = DisplayModule(RobotConfig.DISPLAY)
+    display.initialize()
+    return display
+
+
+@benchmark("display._render[eyes]")
+def bench_render_eyes(clock):
+    display = _display(clock)
+
+    def run():
+        clock.advance(FRAME)
+        display.eyes_controller.update()
+        display._render()
+    return run
+
+
+@benchmark("display._render[image]")
+def bench_render_image(clock):
+    display = _display(clock)
+    event = type("BenchEvent", (), {"data": {'image_path': os.path.join("assets", "img", "asc_3.png")}})
+    display._on_display_image(event)
+
+    def run():
+        # A static image would take the unchanged-frame early-out, force the full compose and present
+        clock.advance(FRAME)
+        display.image_layer.invalidate()
+        display._render()
+    return run
+
+
+@benchmark("display._render[renderer]")
+def bench_render_renderer(clock):
+    display = _display(clock)
+    event = type("BenchEvent", (), {"data": {
+        'account_info': {'user': 'bench#0000', 'rank': 'Ascendant 3', 'rr': 42},
+        'rank_icon': os.path.join("assets", "img", "asc_3.png"),
+        'duration': 0
+    }})
+    display._on_display_valorant_info(event)
+
+    def run():
+        clock.advance(FRAME)
+        display.card_layer.invalidate()
+        display._render()
+    return run
+
+
+def measure(run: Callable[[], None], number: int, repeat: int) -> float:
+    # Median of the rounds: one lucky or preempted round moves neither the
+    # result nor the comparison against the baseline
+    for _ in range(max(number // 10, 1)):
+        run()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            run()
+        timings.append((time.perf_counter() - started) / number)
+    return statistics.median(timings)
+
+
+def run_suite(selected: List[str], number: int, repeat: int) -> Dict[str, float]:
+    results = {}
+    for name in selected:
+        random.seed(0)
+        clock = SimulatedClock()
+        set_clock(clock)
+        results[name] = measure(BENCHMARKS[name](clock), number, repeat)
+        print(f"{name:40s} {results[name] * 1e6:10.2f} us")
+    pygame.quit()
+    return results
+
+
+def run_processes(selected: List[str], number: int, repeat: int, processes: int) -> Dict[str, float]:
+    # A whole interpreter can land tens of percent faster or slower than the
+    # next (hash seeds, memory layout), which rounds inside one process cannot
+    # see; each run gets a fresh process and the median per benchmark is kept
+    runs = []
+    for index in range(processes):
+        print(f"Run {index + 1}/{processes}")
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), *selected, "--number", str(number),
+             "--repeat", str(repeat), "--processes", "1", "--json"],
+            check=True, stdout=subprocess.PIPE, text=True
+        ).stdout
+        runs.append(json.loads(output.splitlines()[-1]))
+    results = {name: statistics.median(run[name] for run in runs) for name in selected}
+    print()
+    for name, seconds in results.items():
+        print(f"{name:40s} {seconds * 1e6:10.2f} us (median of {processes} processes)")
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[Tuple[str, float]]:
+    regressions = []
+    for name, seconds in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        ratio = seconds / reference
+        marker = "REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{name:40s} {reference * 1e6:10.2f} -> {seconds * 1e6:10.2f} us ({ratio - 1:+7.1%}) {marker}")
+        if marker:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the eye rendering and event hot paths")
+    parser.add_argument("benchmarks", nargs="*", help=f"subset to run (default: all of {sorted(BENCHMARKS)})")
+    parser.add_argument("--number", type=int, default=500, help="calls per timing round")
+    parser.add_argument("--repeat", type=int, default=7, help="timing rounds, the median is kept")
+    parser.add_argument("--processes", type=int, default=3,
+                        help="fresh interpreters the suite runs in, the median across them is kept")
+    parser.add_argument("--json", action="store_true", help=argparse.SUPPRESS)  # one run's results, for --processes
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="JSON baseline to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown before a benchmark counts as a regression")
+    parser.add_argument("--update-baseline", action="store_true", help="write results as the new baseline")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {unknown}")
+
+    selected = args.benchmarks or list(BENCHMARKS)
+    if args.processes > 1:
+        results = run_processes(selected, args.number, args.repeat, args.processes)
+    else:
+        results = run_suite(selected, args.number, args.repeat)
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f).get("results", {})
+        baseline.update(results)
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({"machine": platform.platform(), "python": platform.python_version(),
+                       "results": baseline}, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --update-baseline to create one")
+        return
+
+    with open(args.baseline) as f:
+        stored = json.load(f)
+    if stored.get("machine") != platform.platform():
+        print(f"Warning: baseline recorded on {stored.get('machine')}, comparing anyway")
+
+    print()
+    regressions = compare(results, stored.get("results", {}), args.threshold)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import RobotConfig
+from core.robot_controller import RobotController
+from core.event_recorder import EventReplayer
+from modules.display.display_module import DisplayModule
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded Ada event log")
+    parser.add_argument("log", help="event log written by main.py --record")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="playback speed multiplier, 0 replays as fast as possible")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    controller = RobotController(RobotConfig)
+    controller.register_module(DisplayModule(RobotConfig.DISPLAY))
+
+    replayer = EventReplayer(args.log)
+    logger.info(f"Replaying {args.log} (seed={replayer.reader.seed}, speed={args.speed or 'max'})")
+    replayer.replay(controller, speed=args.speed)
+
+
+if __name__ == '__main__':
+    main()
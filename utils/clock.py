@@ -0,0 +1,47 @@
+import time
+
+
+class SystemClock:
+    
+    def now(self) -> float:
+        return time.time()
+    
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+
+class SimulatedClock:
+    # Time only moves when advance() is called, so runs are reproducible and
+    # can go faster (or slower) than real time
+    
+    def __init__(self, start: float = 0.0):
+        self._now = start
+    
+    def now(self) -> float:
+        return self._now
+    
+    def monotonic(self) -> float:
+        return self._now
+    
+    def advance(self, seconds: float):
+        self._now += max(seconds, 0.0)
+
+
+_clock = SystemClock()
+
+
+def get_clock():
+    return _clock
+
+
+def set_clock(clock):
+    global _clock
+    _clock = clock
+
+
+def now() -> float:
+    return _clock.now()
+
+
+def monotonic() -> float:
+    return _clock.monotonic()
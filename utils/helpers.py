@@ -11,7 +11,7 @@ def ease_in_out(t: float) -> float:
 
 
 def draw_heart(surface: pygame.Surface, color: Tuple[int, int, int],
-               x: float, y: float, size: float):
+               x: float, y: float, size: float) -> pygame.Rect:
     points = [
         (x, y + size * 0.25),
         (x - size * 0.5, y - size * 0.25),
@@ -20,4 +20,4 @@ def draw_heart(surface: pygame.Surface, color: Tuple[int, int, int],
         (x + size * 0.5, y - size * 0.6),
         (x + size * 0.5, y - size * 0.25),
     ]
-    pygame.draw.polygon(surface, color, points)
+    return pygame.draw.polygon(surface, color, points)
@@ -0,0 +1,69 @@
+import builtins
+import importlib.util
+import logging
+import sys
+import time
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ImportProfiler:
+    # Same numbers as `python -X importtime`, collected in-process for the
+    # imports performed while the profiler is installed
+
+    def __init__(self):
+        self.entries: List[Tuple[str, float, float, int]] = []
+        self._children: List[float] = []
+        self._original_import = None
+
+    def __enter__(self) -> "ImportProfiler":
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+        return self
+
+    def __exit__(self, *exc_info):
+        builtins.__import__ = self._original_import
+        self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        absolute = name
+        if level:
+            package = (globals or {}).get('__package__') or ''
+            try:
+                absolute = importlib.util.resolve_name('.' * level + name, package)
+            except ImportError:
+                return original(name, globals, locals, fromlist, level)
+        if absolute in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+
+        depth = len(self._children)
+        self._children.append(0.0)
+        started = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - started
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += cumulative
+            self.entries.append((absolute, cumulative - children, cumulative, depth))
+
+    def total(self) -> float:
+        return sum(cumulative for _, _, cumulative, depth in self.entries if depth == 0)
+
+    def format_report(self, min_cumulative: float = 0.0) -> List[str]:
+        lines = ["import time: self [us] | cumulative | imported package"]
+        for name, own, cumulative, depth in self.entries:
+            if cumulative < min_cumulative:
+                continue
+            lines.append(
+                f"import time: {own * 1e6:9.0f} | {cumulative * 1e6:10.0f} | {'  ' * depth}{name}"
+            )
+        lines.append(f"import time: total {self.total() * 1000:.1f} ms")
+        return lines
+
+    def log_report(self, min_cumulative: float = 0.0):
+        for line in self.format_report(min_cumulative):
+            logger.info(line)
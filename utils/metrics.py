@@ -0,0 +1,141 @@
+import os
+import sys
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Any
+
+
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0
+)
+
+COUNT_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+class Histogram:
+    
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+    
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+    
+    def percentile(self, q: float) -> float:
+        # Upper bound of the bucket holding the q-th sample, capped by the observed max
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                if index < len(self.buckets):
+                    return min(self.buckets[index], self.max)
+                return self.max
+        return self.max
+    
+    def reset(self):
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.mean(),
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "buckets": dict(zip(self.buckets + (float("inf"),), self.counts)),
+        }
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Optional[Dict[str, Any]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class PrometheusExposition:
+    # Builds the Prometheus text format (version 0.0.4); HELP/TYPE are written
+    # once per metric family, so samples of a family must be added together
+    
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self.lines: List[str] = []
+        self._declared: Dict[str, str] = {}
+    
+    def _declare(self, name: str, kind: str, help_text: Optional[str]) -> str:
+        name = self.prefix + name
+        if name not in self._declared:
+            self._declared[name] = kind
+            if help_text:
+                self.lines.append(f"# HELP {name} {help_text}")
+            self.lines.append(f"# TYPE {name} {kind}")
+        return name
+    
+    def gauge(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None,
+              help_text: Optional[str] = None):
+        name = self._declare(name, "gauge", help_text)
+        self.lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    
+    def counter(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None,
+                help_text: Optional[str] = None):
+        name = self._declare(name, "counter", help_text)
+        self.lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    
+    def histogram(self, name: str, histogram: Histogram, labels: Optional[Dict[str, Any]] = None,
+                  help_text: Optional[str] = None):
+        name = self._declare(name, "histogram", help_text)
+        labels = dict(labels or {})
+        counts = list(histogram.counts)
+        cumulative = 0
+        for bound, count in zip(histogram.buckets + (float("inf"),), counts):
+            cumulative += count
+            self.lines.append(
+                f"{name}_bucket{_format_labels(dict(labels, le=_format_value(bound)))} {cumulative}"
+            )
+        self.lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.total)}")
+        self.lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+    
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def process_rss_bytes() -> Optional[int]:
+    # Current resident set size; /proc is cheap on the Pi, getrusage only knows the peak
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -0,0 +1,229 @@
+import ast
+import linecache
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Frames that hand an event to a module callback; the callee is attributed to its module
+DISPATCH_SITES = {
+    ("event_manager.py", "_dispatch"),
+    ("module_runner.py", "_drain_inbox"),
+}
+# Innermost frames of a thread that is blocked waiting for work
+IDLE_SITES = {
+    ("threading.py", "wait"),
+    ("synchronize.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),  # idle ThreadPoolExecutor workers block in C on their work queue
+}
+# Calls that park a thread until something happens; a thread whose innermost
+# Python frame is inside one of these is idle wherever the call is made from
+BLOCKING_CALLS = {"get", "wait", "sleep", "select", "poll", "accept", "recv", "recv_into", "recvfrom",
+                  "acquire", "join"}
+MAX_DEPTH = 64
+
+
+def _called_name(code, offset: int) -> Optional[str]:
+    # Name of the function called at bytecode `offset`, read back from the
+    # source span of the call expression (Python 3.11+ records it per instruction)
+    positions = getattr(code, 'co_positions', None)
+    if positions is None:
+        return None
+    for index, position in enumerate(positions()):
+        if index * 2 == offset:
+            break
+    else:
+        return None
+    line, end_line, column, end_column = position
+    if None in position:
+        return None
+    lines = [linecache.getline(code.co_filename, number) for number in range(line, end_line + 1)]
+    lines[-1] = lines[-1][:end_column]
+    lines[0] = lines[0][column:]
+    try:
+        node = ast.parse("".join(lines).strip(), mode="eval").body
+    except SyntaxError:
+        return None
+    if not isinstance(node, ast.Call):
+        return None
+    return node.func.attr if isinstance(node.func, ast.Attribute) else getattr(node.func, 'id', None)
+
+
+class SamplingProfiler:
+    # Statistical profiler: a daemon thread snapshots every thread's stack via
+    # sys._current_frames() and counts collapsed stacks, so the cost is paid by
+    # the sampler rather than by instrumenting the hot paths.
+
+    def __init__(self, interval: float = 0.005, output_dir: str = "profiles",
+                 max_duration: Optional[float] = None, include_idle: bool = False):
+        self.interval = interval
+        self.output_dir = output_dir
+        self.max_duration = max_duration
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.modules: Counter = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.last_output: Optional[str] = None
+        self._labels: Dict[Tuple[object, int], str] = {}
+        self._blocking: Dict[Tuple[object, int], bool] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._started_at = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: Optional[float] = None):
+        if self.running:
+            return
+        self.reset()
+        duration = duration or self.max_duration
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(duration,), name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Sampling profiler started ({self.interval * 1000:.1f} ms interval"
+                    f"{f', {duration:g}s max' if duration else ''})")
+
+    def stop(self, wait: bool = False):
+        # Safe to call from a signal handler: the sampler thread writes the dump itself
+        self._stop.set()
+        if wait and self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def toggle(self, duration: Optional[float] = None):
+        if self.running:
+            self.stop()
+        else:
+            self.start(duration)
+
+    def install_signal_handler(self, signal_name: str = "SIGUSR1") -> bool:
+        signum = getattr(signal, signal_name, None)
+        if signum is None or threading.current_thread() is not threading.main_thread():
+            logger.warning(f"Cannot install profiler toggle on {signal_name}")
+            return False
+        signal.signal(signum, lambda *_: self.toggle())
+        logger.info(f"Send {signal_name} to pid {os.getpid()} to toggle the sampling profiler")
+        return True
+
+    def reset(self):
+        self.stacks.clear()
+        self.modules.clear()
+        self.samples = 0
+        self.idle_samples = 0
+
+    def _run(self, duration: Optional[float]):
+        self._started_at = time.monotonic()
+        deadline = self._started_at + duration if duration else None
+        try:
+            while not self._stop.wait(self.interval):
+                self.sample()
+                if deadline and time.monotonic() >= deadline:
+                    break
+        finally:
+            self.last_output = self.dump()
+
+    def sample(self):
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            frames = []
+            while frame is not None and len(frames) < MAX_DEPTH:
+                frames.append(frame)
+                frame = frame.f_back
+            if not frames:
+                continue
+
+            if self._is_idle(frames[0]):
+                self.idle_samples += 1
+                if not self.include_idle:
+                    continue
+
+            module = self._attribute(frames) or names.get(thread_id, str(thread_id))
+            stack = ";".join([module] + [self._label(f) for f in reversed(frames)])
+            self.stacks[stack] += 1
+            self.modules[module] += 1
+            self.samples += 1
+
+    def _is_idle(self, frame) -> bool:
+        code = frame.f_code
+        if (os.path.basename(code.co_filename), code.co_name) in IDLE_SITES:
+            return True
+        key = (code, frame.f_lasti)
+        blocking = self._blocking.get(key)
+        if blocking is None:
+            blocking = self._blocking[key] = _called_name(code, frame.f_lasti) in BLOCKING_CALLS
+        return blocking
+
+    def _label(self, frame) -> str:
+        key = (frame.f_code, frame.f_lineno)
+        label = self._labels.get(key)
+        if label is None:
+            code = frame.f_code
+            name = getattr(code, 'co_qualname', code.co_name)
+            label = self._labels[key] = f"{name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+        return label
+
+    @staticmethod
+    def _owner(frame) -> Optional[str]:
+        code = frame.f_code
+        if not code.co_argcount:
+            return None
+        owner = frame.f_locals.get(code.co_varnames[0])
+        if owner is not None and hasattr(owner, 'get_name'):
+            return owner.get_name()
+        return None
+
+    def _attribute(self, frames) -> Optional[str]:
+        # frames run innermost first; the closest module update or callback wins
+        for index, frame in enumerate(frames):
+            code = frame.f_code
+            if code.co_name == 'update':
+                owner = self._owner(frame)
+                if owner:
+                    return owner
+            caller = frames[index + 1] if index + 1 < len(frames) else None
+            if caller is not None and (
+                    os.path.basename(caller.f_code.co_filename), caller.f_code.co_name) in DISPATCH_SITES:
+                return self._owner(frame) or f"events:{getattr(code, 'co_qualname', code.co_name)}"
+        return None
+
+    def collapsed(self) -> List[str]:
+        return [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+
+    def module_breakdown(self) -> List[Tuple[str, float]]:
+        total = sum(self.modules.values()) or 1
+        return [(name, count / total) for name, count in self.modules.most_common()]
+
+    def dump(self, path: Optional[str] = None) -> Optional[str]:
+        if not self.samples:
+            logger.info(f"Sampling profiler stopped without samples ({self.idle_samples} idle)")
+            return None
+        if path is None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            stem = os.path.join(self.output_dir, time.strftime("profile-%Y%m%d-%H%M%S"))
+            path, suffix = f"{stem}.collapsed", 1
+            while os.path.exists(path):
+                path, suffix = f"{stem}-{suffix}.collapsed", suffix + 1
+        with open(path, "w") as f:
+            f.write("\n".join(self.collapsed()))
+            f.write("\n")
+
+        elapsed = time.monotonic() - self._started_at
+        breakdown = ", ".join(f"{name} {share:.0%}" for name, share in self.module_breakdown()[:8])
+        logger.info(f"Profile of {elapsed:.1f}s ({self.samples} samples, {self.idle_samples} idle) "
+                    f"written to {path}: {breakdown}")
+        return path